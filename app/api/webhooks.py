@@ -1,26 +1,165 @@
 """
 Webhook endpoints for Twilio integration
 """
+import base64
+import hashlib
+import hmac
 import logging
-from typing import Optional
+from typing import Dict, Hashable, Optional
+from urllib.parse import parse_qsl, urlparse
 from fastapi import APIRouter, Request, Response, HTTPException, Depends
 from fastapi.responses import PlainTextResponse
-import xml.etree.ElementTree as ET
-from twilio.twiml.voice_response import VoiceResponse, Stream
-from twilio.request_validator import RequestValidator
+from xml.sax.saxutils import escape
+from twilio.request_validator import add_port, remove_port
 
 from app.core.config import get_settings
 from app.core.websocket_manager import WebSocketManager
 from app.core.conversation_state import ConversationState
 from app.models.call import CallRecord
-from app.core.security_utils import generate_secure_token, audit_log
+from app.core.security_utils import generate_pooled_token, audit_log
+from app.utils.expiring_keys import ExpiringKeys
 
 logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
 
 settings = get_settings()
 websocket_manager = WebSocketManager(max_connections=settings.MAX_CONCURRENT_CALLS)
 
+# Validation decision and HMAC key are fixed for the process lifetime;
+# each request copies the keyed prototype instead of re-deriving the key pads
+_SKIP_VALIDATION: bool = settings.ENVIRONMENT == "development"
+_HMAC_PROTO: Optional["hmac.HMAC"] = (
+    hmac.new(settings.TWILIO_AUTH_TOKEN.encode('utf-8'), digestmod=hashlib.sha1)
+    if settings.TWILIO_AUTH_TOKEN else None
+)
+
+if _SKIP_VALIDATION:
+    # Skip validation in development for easier testing
+    logger.warning("Skipping Twilio validation in development mode")
+
+# TwiML is emitted from string templates (same output as twilio's VoiceResponse)
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+_ATTR_ENTITIES = {'"': "&quot;"}
+_DEFAULT_GREETING = "Thank you for calling. How may I assist you today?"
+_DEFAULT_GREETING_ESCAPED = escape(_DEFAULT_GREETING)
+
+
+def _escape_attr(value: str) -> str:
+    """Escape a value for use inside a double-quoted XML attribute"""
+    return escape(value, _ATTR_ENTITIES)
+
+
+# Incoming-call TwiML is static apart from the stream URL, stream ID and call SID,
+# so the surrounding bytes (declaration, greeting, verbs) are built once
+_INCOMING_CALL_PREFIX = (
+    _XML_DECLARATION
+    + '<Response><Say voice="alice">' + _DEFAULT_GREETING_ESCAPED + '</Say>'
+    '<Stream url="'
+).encode('utf-8')
+_INCOMING_CALL_STREAM_ID = b'"><Parameter name="streamId" value="'
+_INCOMING_CALL_CALL_SID = b'" /><Parameter name="callSid" value="'
+_INCOMING_CALL_SUFFIX = b'" /></Stream></Response>'
+
+# Fallback TwiML returned when handling an incoming call fails
+_ERROR_TWIML = (
+    _XML_DECLARATION
+    + '<Response><Say voice="alice">'
+    + escape("We're experiencing technical difficulties. Please try again later.")
+    + '</Say><Hangup /></Response>'
+).encode('utf-8')
+
+# Static response headers and WebSocket URL scheme for TwiML responses
+_TWIML_HEADERS = {"Cache-Control": "no-cache", "Content-Type": "application/xml"}
+_WS_SCHEME = "wss://" if settings.USE_HTTPS else "ws://"
+
+# Call statuses that end a call without it having completed normally
+_FAILED_STATUSES = frozenset({'failed', 'busy', 'no-answer'})
+
+# Twilio delivers status callbacks at least once; recently handled events are
+# remembered so retried deliveries skip cleanup and logging
+_SEEN_EVENTS = ExpiringKeys(maxsize=4096, ttl=600)
+
+
+def _already_handled(key: Hashable) -> bool:
+    """
+    Check whether a status callback was already processed
+    
+    Args:
+        key: Event identity, e.g. (CallSid, CallStatus)
+        
+    Returns:
+        True if the same event was handled within the cache TTL
+    """
+    return key[0] is not None and key in _SEEN_EVENTS
+
+
+def _mark_handled(key: Hashable) -> None:
+    """Remember a successfully processed status callback"""
+    if key[0] is not None:
+        _SEEN_EVENTS.add(key)
+
+
+async def _twilio_form(request: Request) -> Dict[str, str]:
+    """
+    Parse Twilio's urlencoded webhook body into a dict
+    
+    Twilio posts application/x-www-form-urlencoded, so the body is parsed
+    directly instead of going through Starlette's form parser. The raw body
+    is cached by Starlette, so validation and handlers can both call this.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        Dictionary of form parameters
+    """
+    if request.headers.get('content-type', '').startswith('multipart/'):
+        return dict(await request.form())
+    
+    body = await request.body()
+    return dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+
+
+def _compute_twilio_signature(uri: str, params: Dict[str, str]) -> bytes:
+    """
+    Compute Twilio's X-Twilio-Signature for a request
+    
+    Args:
+        uri: Full URL Twilio requested
+        params: POST parameters sent with the request
+        
+    Returns:
+        Base64 encoded HMAC-SHA1 of the URL followed by the sorted parameters
+    """
+    mac = _HMAC_PROTO.copy()
+    mac.update(uri.encode('utf-8'))
+    for name in sorted(params):
+        mac.update(name.encode('utf-8'))
+        mac.update(params[name].encode('utf-8'))
+    return base64.b64encode(mac.digest())
+
+
+def _validate_signature(url: str, params: Dict[str, str], signature: str) -> bool:
+    """
+    Check a Twilio signature against the URL with and without its port,
+    since Twilio's signing is inconsistent about including it
+    
+    Args:
+        url: Full URL Twilio requested
+        params: POST parameters sent with the request
+        signature: Value of the X-Twilio-Signature header
+        
+    Returns:
+        True if the signature matches either URL form
+    """
+    expected = signature.encode('utf-8')
+    parsed_url = urlparse(url)
+    
+    if hmac.compare_digest(_compute_twilio_signature(remove_port(parsed_url), params), expected):
+        return True
+    return hmac.compare_digest(_compute_twilio_signature(add_port(parsed_url), params), expected)
+
 
 async def validate_twilio_request(request: Request) -> bool:
     """
@@ -32,12 +171,12 @@ async def validate_twilio_request(request: Request) -> bool:
     Returns:
         True if request is valid from Twilio
     """
-    if settings.ENVIRONMENT == "development":
-        # Skip validation in development for easier testing
-        logger.warning("Skipping Twilio validation in development mode")
+    if _SKIP_VALIDATION:
         return True
     
-    validator = RequestValidator(settings.TWILIO_AUTH_TOKEN)
+    if _HMAC_PROTO is None:
+        logger.error("TWILIO_AUTH_TOKEN not configured, rejecting webhook request")
+        return False
     
     # Get the full URL
     url = str(request.url)
@@ -47,26 +186,39 @@ async def validate_twilio_request(request: Request) -> bool:
     
     # Get POST parameters from request body
     try:
-        form_data = await request.form()
-        params = dict(form_data)
+        params = await _twilio_form(request)
     except Exception as e:
         logger.error(f"Failed to parse form data for Twilio validation: {e}")
         params = {}
     
     # Validate the request
-    is_valid = validator.validate(url, params, signature)
+    is_valid = _validate_signature(url, params, signature)
     
     if not is_valid:
-        logger.warning(f"Invalid Twilio request signature from {request.client.host}")
-        audit_log("security_alert", {
-            "type": "invalid_twilio_signature",
-            "client_ip": request.client.host,
-            "url": url
-        })
+        client_ip = request.client.host if request.client else None
+        logger.warning(f"Invalid Twilio request signature from {client_ip}")
+        logger.warning(
+            f"AUDIT: security_alert | Type: invalid_twilio_signature | "
+            f"Client: {client_ip} | URL: {url}"
+        )
     
     return is_valid
 
 
+async def verify_twilio(request: Request) -> None:
+    """
+    FastAPI dependency rejecting webhook requests not signed by Twilio
+    
+    Args:
+        request: FastAPI request object
+        
+    Raises:
+        HTTPException: 403 if the Twilio signature is invalid
+    """
+    if not await validate_twilio_request(request):
+        raise HTTPException(status_code=403, detail="Invalid request signature")
+
+
 def create_twiml_response(
     greeting: Optional[str] = None,
     websocket_url: Optional[str] = None,
@@ -85,24 +237,25 @@ def create_twiml_response(
     Returns:
         TwiML XML string
     """
-    response = VoiceResponse()
-    
     # Use default greeting if none provided
-    if greeting is None:
-        greeting = "Thank you for calling. How may I assist you today?"
+    escaped_greeting = _DEFAULT_GREETING_ESCAPED if greeting is None else escape(greeting)
     
     # Say greeting
-    response.say(greeting, voice=voice, language=language)
+    parts = [
+        _XML_DECLARATION,
+        '<Response><Say language="', _escape_attr(language),
+        '" voice="', _escape_attr(voice), '">', escaped_greeting, '</Say>'
+    ]
     
     # Add stream if URL provided
     if websocket_url:
-        stream = Stream(url=websocket_url)
-        response.append(stream)
+        parts += ('<Stream url="', _escape_attr(websocket_url), '" />')
     
-    return str(response)
+    parts.append('</Response>')
+    return ''.join(parts)
 
 
-@router.post("/incoming-call")
+@router.post("/incoming-call", dependencies=[Depends(verify_twilio)])
 @audit_log("incoming_call_webhook")
 async def handle_incoming_call(request: Request) -> Response:
     """
@@ -116,12 +269,8 @@ async def handle_incoming_call(request: Request) -> Response:
     - CallStatus: Current status of the call
     """
     try:
-        # Validate request is from Twilio
-        if not await validate_twilio_request(request):
-            raise HTTPException(status_code=403, detail="Invalid request signature")
-        
         # Parse form data from Twilio
-        form_data = await request.form()
+        form_data = await _twilio_form(request)
         
         # Extract call information
         call_sid = form_data.get('CallSid')
@@ -133,10 +282,13 @@ async def handle_incoming_call(request: Request) -> Response:
             logger.error("Missing required Twilio parameters")
             raise HTTPException(status_code=400, detail="Missing required parameters")
         
-        logger.info(f"Incoming call: {call_sid} from {from_number} to {to_number} (status: {call_status})")
+        logger.info(
+            "Incoming call: %s from %s to %s (status: %s)",
+            call_sid, from_number, to_number, call_status
+        )
         
         # Generate unique stream ID for this call
-        stream_id = f"{call_sid}_{generate_secure_token(8)}"
+        stream_id = f"{call_sid}_{generate_pooled_token(8)}"
         
         # Initialize conversation state for this call
         conversation_state = ConversationState(
@@ -149,34 +301,32 @@ async def handle_incoming_call(request: Request) -> Response:
         # Store conversation state (will be retrieved by WebSocket handler)
         await websocket_manager.store_conversation_state(stream_id, conversation_state)
         
-        # Create TwiML response
-        response = VoiceResponse()
-        
         # Get client configuration for custom greeting
         # TODO: Implement client lookup based on to_number
-        greeting = "Thank you for calling. How may I assist you today?"
-        
-        # Say initial greeting
-        response.say(greeting, voice='alice')
+        # (the default greeting is baked into _INCOMING_CALL_PREFIX)
         
         # Start bi-directional streaming
         # Construct WebSocket URL
-        ws_protocol = "wss" if settings.USE_HTTPS else "ws"
         ws_host = settings.WEBSOCKET_HOST or request.headers.get('host', 'localhost')
-        ws_url = f"{ws_protocol}://{ws_host}/media-stream/{stream_id}"
+        ws_url = "".join((_WS_SCHEME, ws_host, "/media-stream/", stream_id))
         
-        logger.info(f"Starting media stream to: {ws_url}")
+        logger.info("Starting media stream to: %s", ws_url)
         
-        stream = Stream(url=ws_url)
-        stream.parameter(name='streamId', value=stream_id)
-        stream.parameter(name='callSid', value=call_sid)
-        response.append(stream)
+        # Build TwiML: splice the per-call fields into the cached greeting bytes
+        twiml = b"".join((
+            _INCOMING_CALL_PREFIX,
+            _escape_attr(ws_url).encode('utf-8'),
+            _INCOMING_CALL_STREAM_ID,
+            _escape_attr(stream_id).encode('utf-8'),
+            _INCOMING_CALL_CALL_SID,
+            _escape_attr(call_sid).encode('utf-8'),
+            _INCOMING_CALL_SUFFIX
+        ))
         
         # Return TwiML response
         return Response(
-            content=str(response),
-            media_type="application/xml",
-            headers={"Cache-Control": "no-cache"}
+            content=twiml,
+            headers=_TWIML_HEADERS
         )
         
     except HTTPException:
@@ -185,37 +335,27 @@ async def handle_incoming_call(request: Request) -> Response:
         logger.error(f"Error handling incoming call: {e}", exc_info=True)
         
         # Return error TwiML
-        error_response = VoiceResponse()
-        error_response.say(
-            "We're experiencing technical difficulties. Please try again later.",
-            voice='alice'
-        )
-        error_response.hangup()
-        
-        return Response(
-            content=str(error_response),
-            media_type="application/xml"
-        )
+        return Response(content=_ERROR_TWIML, headers=_TWIML_HEADERS)
 
 
-@router.post("/call-status")
+@router.post("/call-status", dependencies=[Depends(verify_twilio)])
 async def handle_call_status(request: Request) -> PlainTextResponse:
     """
     Handle call status updates from Twilio
     Called when call state changes (ringing, answered, completed, etc.)
     """
     try:
-        # Validate request
-        if not await validate_twilio_request(request):
-            raise HTTPException(status_code=403, detail="Invalid request signature")
-        
         # Parse form data
-        form_data = await request.form()
+        form_data = await _twilio_form(request)
         
         call_sid = form_data.get('CallSid')
         call_status = form_data.get('CallStatus')
         call_duration = form_data.get('CallDuration')
         
+        event_key = (call_sid, call_status)
+        if _already_handled(event_key):
+            return PlainTextResponse("OK")
+        
         logger.info(f"Call status update: {call_sid} - {call_status} (duration: {call_duration}s)")
         
         # Handle different statuses
@@ -226,10 +366,11 @@ async def handle_call_status(request: Request) -> PlainTextResponse:
             # TODO: Save call record to database
             # TODO: Send SMS confirmation if appointment was booked
             
-        elif call_status == 'failed' or call_status == 'busy' or call_status == 'no-answer':
+        elif call_status in _FAILED_STATUSES:
             logger.warning(f"Call failed: {call_sid} - {call_status}")
             await websocket_manager.cleanup_call(call_sid)
         
+        _mark_handled(event_key)
         return PlainTextResponse("OK")
         
     except HTTPException:
@@ -239,25 +380,25 @@ async def handle_call_status(request: Request) -> PlainTextResponse:
         return PlainTextResponse("Error", status_code=500)
 
 
-@router.post("/recording-status")
+@router.post("/recording-status", dependencies=[Depends(verify_twilio)])
 async def handle_recording_status(request: Request) -> PlainTextResponse:
     """
     Handle recording status updates from Twilio
     Used if call recording is enabled for compliance
     """
     try:
-        # Validate request
-        if not await validate_twilio_request(request):
-            raise HTTPException(status_code=403, detail="Invalid request signature")
-        
         # Parse form data
-        form_data = await request.form()
+        form_data = await _twilio_form(request)
         
         call_sid = form_data.get('CallSid')
         recording_sid = form_data.get('RecordingSid')
         recording_status = form_data.get('RecordingStatus')
         recording_url = form_data.get('RecordingUrl')
         
+        event_key = (recording_sid, recording_status)
+        if _already_handled(event_key):
+            return PlainTextResponse("OK")
+        
         logger.info(f"Recording status: {recording_sid} for call {call_sid} - {recording_status}")
         
         if recording_status == 'completed' and recording_url:
@@ -265,6 +406,7 @@ async def handle_recording_status(request: Request) -> PlainTextResponse:
             # TODO: Update call record with recording URL
             pass
         
+        _mark_handled(event_key)
         return PlainTextResponse("OK")
         
     except Exception as e:
@@ -272,31 +414,32 @@ async def handle_recording_status(request: Request) -> PlainTextResponse:
         return PlainTextResponse("Error", status_code=500)
 
 
-@router.post("/sms-status")
+@router.post("/sms-status", dependencies=[Depends(verify_twilio)])
 async def handle_sms_status(request: Request) -> PlainTextResponse:
     """
     Handle SMS delivery status updates from Twilio
     Used to track appointment confirmation delivery
     """
     try:
-        # Validate request
-        if not await validate_twilio_request(request):
-            raise HTTPException(status_code=403, detail="Invalid request signature")
-        
         # Parse form data
-        form_data = await request.form()
+        form_data = await _twilio_form(request)
         
         message_sid = form_data.get('MessageSid')
         message_status = form_data.get('MessageStatus')
         to_number = form_data.get('To')
         error_code = form_data.get('ErrorCode')
         
+        event_key = (message_sid, message_status)
+        if _already_handled(event_key):
+            return PlainTextResponse("OK")
+        
         logger.info(f"SMS status: {message_sid} to {to_number} - {message_status}")
         
         if error_code:
             logger.error(f"SMS delivery failed: {message_sid} - Error {error_code}")
             # TODO: Implement retry logic or alternative notification
         
+        _mark_handled(event_key)
         return PlainTextResponse("OK")
         
     except Exception as e:
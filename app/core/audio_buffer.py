@@ -2,22 +2,69 @@
 Audio buffer management for streaming audio processing
 Handles buffering of audio chunks for real-time STT processing
 """
-import asyncio
 import logging
-from collections import deque
-from typing import Optional, Deque, Tuple, List
-import struct
+from typing import Final, Optional, Union
 import numpy as np
 
+from app.utils.audio_utils import _MULAW_TO_PCM_LUT
+
 logger = logging.getLogger(__name__)
 
+# Numba is optional - fall back to the NumPy lookup path when not installed
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Squared linear amplitude for every possible μ-law byte, from the shared
+# G.711 decode table. Twilio audio is 8-bit μ-law, so per-sample energy is
+# a 256-entry lookup.
+_MULAW_ENERGY_LUT = np.square(_MULAW_TO_PCM_LUT, dtype=np.float32)
+
+# Full-scale amplitude of a 16-bit linear sample
+_PCM_FULL_SCALE = 32767.0
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _mulaw_silence(buf: np.ndarray, lut: np.ndarray, threshold_energy: float) -> bool:
+        """Fused LUT gather + sum + threshold compare over μ-law bytes"""
+        acc = 0.0
+        for i in range(buf.shape[0]):
+            acc += lut[buf[i]]
+        return acc < threshold_energy * buf.shape[0]
+    
+    # Warm up the JIT so the compile cost is not paid by the first caller
+    _mulaw_silence(np.full(1600, 0xFF, dtype=np.uint8), _MULAW_ENERGY_LUT, 1.0)
+else:
+    _mulaw_silence = None
+
 
 class AudioBuffer:
     """
     Manages audio buffering for real-time streaming
     Handles chunk aggregation and silence detection with VAD
+    
+    Audio is stored in a preallocated byte ring sized for max_buffer_size
+    μ-law frames (1 byte per sample). When full, the oldest audio is dropped.
+    
+    Not locked: each buffer is owned by a single connection task, and none of
+    the methods await, so asyncio cannot interleave two operations.
     """
     
+    __slots__ = (
+        'sample_rate', 'chunk_duration_ms', 'buffer_duration_ms',
+        'silence_threshold', 'max_buffer_size', 'vad_enabled',
+        '_mulaw_energy_lut', '_silence_threshold_energy',
+        'samples_per_chunk', 'chunks_per_buffer',
+        '_capacity', '_ring', '_head', '_size',
+        '_chunk_bytes', '_warning_size',
+        'total_chunks_received', 'total_chunks_processed',
+        'is_speech_active', 'silence_chunks', 'consecutive_speech_chunks',
+    )
+    
     def __init__(
         self,
         sample_rate: int = 8000,  # Twilio uses 8kHz
@@ -34,10 +81,19 @@ class AudioBuffer:
             sample_rate: Audio sample rate in Hz
             chunk_duration_ms: Duration of each audio chunk in milliseconds
             buffer_duration_ms: Target buffer duration before processing
-            silence_threshold: RMS threshold for silence detection
+            silence_threshold: RMS threshold for silence detection (fraction of full scale)
             max_buffer_size: Maximum buffer size to prevent memory issues
             vad_enabled: Enable Voice Activity Detection
+            
+        Raises:
+            ValueError: If buffer_duration_ms is not a multiple of chunk_duration_ms
         """
+        if buffer_duration_ms % chunk_duration_ms != 0:
+            raise ValueError(
+                f"buffer_duration_ms ({buffer_duration_ms}) must be an integer multiple "
+                f"of chunk_duration_ms ({chunk_duration_ms})"
+            )
+        
         self.sample_rate = sample_rate
         self.chunk_duration_ms = chunk_duration_ms
         self.buffer_duration_ms = buffer_duration_ms
@@ -45,13 +101,21 @@ class AudioBuffer:
         self.max_buffer_size = max_buffer_size
         self.vad_enabled = vad_enabled
         
-        # Calculate samples per chunk
-        self.samples_per_chunk = int(sample_rate * chunk_duration_ms / 1000)
-        self.chunks_per_buffer = int(buffer_duration_ms / chunk_duration_ms)
+        # Precomputed VAD constants (mean-square energy compared in linear units)
+        self._mulaw_energy_lut = _MULAW_ENERGY_LUT
+        self._silence_threshold_energy = (silence_threshold * _PCM_FULL_SCALE) ** 2
         
-        # Audio buffer with overflow protection
-        self.buffer: Deque[Tuple[bytes, int]] = deque(maxlen=max_buffer_size)
-        self.overflow_buffer: List[bytes] = []  # Store remnants between calls
+        # Calculate samples per chunk (fixed for the buffer's lifetime)
+        self.samples_per_chunk: Final[int] = sample_rate * chunk_duration_ms // 1000
+        self.chunks_per_buffer: Final[int] = buffer_duration_ms // chunk_duration_ms
+        
+        # Preallocated ring of μ-law bytes
+        self._capacity: Final[int] = max_buffer_size * self.samples_per_chunk
+        self._ring = bytearray(self._capacity)
+        self._head = 0  # Read offset into the ring
+        self._size = 0  # Number of buffered bytes
+        self._chunk_bytes: Final[int] = self.samples_per_chunk * self.chunks_per_buffer  # 1 byte/sample
+        self._warning_size: Final[int] = int(self._capacity * 0.9)
         
         # State tracking
         self.total_chunks_received = 0
@@ -60,36 +124,48 @@ class AudioBuffer:
         self.silence_chunks = 0
         self.consecutive_speech_chunks = 0
         
-        # Thread safety
-        self._lock = asyncio.Lock()
-        
         logger.info(
-            f"AudioBuffer initialized: {sample_rate}Hz, {chunk_duration_ms}ms chunks, "
-            f"{buffer_duration_ms}ms buffer, VAD={'enabled' if vad_enabled else 'disabled'}"
+            "AudioBuffer initialized: %dHz, %dms chunks, %dms buffer, VAD=%s",
+            sample_rate, chunk_duration_ms, buffer_duration_ms,
+            'enabled' if vad_enabled else 'disabled'
         )
     
     async def add(self, audio_data: bytes, timestamp: int):
         """
-        Add audio chunk to buffer with overflow handling
+        Add audio chunk to buffer; the oldest audio is dropped when full
         
         Args:
             audio_data: Raw audio bytes
-            timestamp: Timestamp or sequence number
+            timestamp: Timestamp or sequence number (not retained)
         """
-        async with self._lock:
-            # Handle any overflow from previous operations
-            if self.overflow_buffer:
-                audio_data = b''.join(self.overflow_buffer) + audio_data
-                self.overflow_buffer.clear()
-            
-            self.buffer.append((audio_data, timestamp))
-            self.total_chunks_received += 1
-            
-            # Check if we're approaching max buffer size
-            if len(self.buffer) > self.max_buffer_size * 0.9:
-                logger.warning(
-                    f"Audio buffer near capacity: {len(self.buffer)}/{self.max_buffer_size}"
-                )
+        self.total_chunks_received += 1
+        self._write(audio_data)
+        
+        # Check if we're approaching max buffer size
+        if self._size > self._warning_size:
+            logger.warning(
+                "Audio buffer near capacity: %d/%d", len(self), self.max_buffer_size
+            )
+    
+    async def add_joined(self, audio_data: bytes, frame_count: int):
+        """
+        Add several frames whose audio is already concatenated
+        
+        Args:
+            audio_data: Raw audio bytes for all frames, in arrival order
+            frame_count: Number of frames joined into audio_data
+        """
+        if not frame_count:
+            return
+        
+        self.total_chunks_received += frame_count
+        self._write(audio_data)
+        
+        # Check if we're approaching max buffer size
+        if self._size > self._warning_size:
+            logger.warning(
+                "Audio buffer near capacity: %d/%d", len(self), self.max_buffer_size
+            )
     
     def add_sync(self, audio_data: bytes, timestamp: int):
         """
@@ -97,29 +173,74 @@ class AudioBuffer:
         
         Args:
             audio_data: Raw audio bytes
-            timestamp: Timestamp or sequence number
+            timestamp: Timestamp or sequence number (not retained)
         """
-        self.buffer.append((audio_data, timestamp))
         self.total_chunks_received += 1
+        self._write(audio_data)
     
-    async def has_sufficient_data(self) -> bool:
+    def _write(self, audio_data: bytes):
         """
-        Check if buffer has enough data for processing
+        Copy audio into the ring, dropping the oldest bytes on overflow
         
-        Returns:
-            True if buffer has sufficient data
+        Args:
+            audio_data: Raw audio bytes
         """
-        async with self._lock:
-            return len(self.buffer) >= self.chunks_per_buffer
+        n = len(audio_data)
+        if not n:
+            return
+        
+        capacity = self._capacity
+        if n >= capacity:
+            # Larger than the whole ring - keep only the newest audio
+            self._ring[:] = audio_data[n - capacity:]
+            self._head = 0
+            self._size = capacity
+            return
+        
+        overflow = self._size + n - capacity
+        if overflow > 0:
+            self._head = (self._head + overflow) % capacity
+            self._size -= overflow
+        
+        tail = (self._head + self._size) % capacity
+        first = min(n, capacity - tail)
+        self._ring[tail:tail + first] = audio_data[:first]
+        if first < n:
+            self._ring[:n - first] = audio_data[first:]
+        self._size += n
     
-    def has_sufficient_data_sync(self) -> bool:
+    def _read(self, n: int, copy: bool = True) -> Union[bytes, memoryview]:
         """
-        Synchronous version for non-async contexts
+        Copy n bytes out of the ring and advance the read offset
         
+        Args:
+            n: Number of bytes to read (must not exceed buffered size)
+            copy: If False, return a view into the ring when the bytes are
+                contiguous (valid only until the next write)
+            
         Returns:
-            True if buffer has sufficient data
+            Audio bytes in arrival order
         """
-        return len(self.buffer) >= self.chunks_per_buffer
+        head = self._head
+        end = head + n
+        view = memoryview(self._ring)
+        if end <= self._capacity:
+            data = bytes(view[head:end]) if copy else view[head:end]
+        else:
+            data = b''.join((view[head:], view[:end - self._capacity]))
+        
+        self._head = end % self._capacity
+        self._size -= n
+        return data
+    
+    def _frames(self, n_bytes: int) -> int:
+        """Number of frames covered by n_bytes (partial frames count as one)"""
+        return -(-n_bytes // self.samples_per_chunk)
+    
+    @property
+    def ready(self) -> bool:
+        """True if buffer has enough data for one aggregated chunk"""
+        return self._size >= self._chunk_bytes
     
     async def get_chunk(self) -> Optional[bytes]:
         """
@@ -128,26 +249,37 @@ class AudioBuffer:
         Returns:
             Aggregated audio bytes or None if insufficient data
         """
-        async with self._lock:
-            if len(self.buffer) < self.chunks_per_buffer:
-                return None
-            
-            # Collect chunks for processing
-            audio_chunks = []
-            for _ in range(self.chunks_per_buffer):
-                if self.buffer:
-                    audio_data, _ = self.buffer.popleft()
-                    audio_chunks.append(audio_data)
-                    self.total_chunks_processed += 1
-            
-            if not audio_chunks:
-                return None
-            
-            # Concatenate chunks
-            combined_audio = b''.join(audio_chunks)
-            
-            # Check for silence
-            if self._is_silence(combined_audio):
+        return self._next_chunk(copy=True)
+    
+    async def get_all_chunks_view(self) -> Optional[Union[bytes, memoryview]]:
+        """
+        Get every whole aggregated chunk currently buffered as one view
+        
+        Lets a burst of chunks go out in a single send without copying them
+        out of the ring. The view is only valid until the next add, so it
+        must be consumed (e.g. sent) before more audio is buffered; chunks
+        that wrap the end of the ring are returned as a copy. VAD still runs
+        on each chunk separately.
+        
+        Returns:
+            Concatenated chunks view or None if insufficient data
+        """
+        return self._next_chunk(copy=False, max_chunks=self._size // self._chunk_bytes)
+    
+    def _next_chunk(
+        self, copy: bool, max_chunks: int = 1
+    ) -> Optional[Union[bytes, memoryview]]:
+        """Read up to max_chunks aggregated chunks and update speech state"""
+        if self._size < self._chunk_bytes:
+            return None
+        
+        chunk_bytes = self._chunk_bytes
+        combined_audio = self._read(chunk_bytes * max_chunks, copy)
+        self.total_chunks_processed += self.chunks_per_buffer * max_chunks
+        
+        # Check for silence, one aggregated chunk at a time
+        for offset in range(0, len(combined_audio), chunk_bytes):
+            if self._is_silence(combined_audio[offset:offset + chunk_bytes]):
                 self.silence_chunks += 1
                 if self.is_speech_active and self.silence_chunks > 10:  # 200ms of silence
                     self.is_speech_active = False
@@ -157,8 +289,8 @@ class AudioBuffer:
                 if not self.is_speech_active:
                     self.is_speech_active = True
                     logger.debug("Speech started")
-            
-            return combined_audio
+        
+        return combined_audio
     
     def get_chunk_sync(self) -> Optional[bytes]:
         """
@@ -167,24 +299,14 @@ class AudioBuffer:
         Returns:
             Aggregated audio bytes or None if insufficient data
         """
-        if len(self.buffer) < self.chunks_per_buffer:
+        if self._size < self._chunk_bytes:
             return None
         
-        # Collect chunks for processing
-        audio_chunks = []
-        for _ in range(self.chunks_per_buffer):
-            if self.buffer:
-                audio_data, _ = self.buffer.popleft()
-                audio_chunks.append(audio_data)
-                self.total_chunks_processed += 1
-        
-        if not audio_chunks:
-            return None
-        
-        # Concatenate chunks
-        return b''.join(audio_chunks)
+        # Copy one aggregated chunk out of the ring
+        self.total_chunks_processed += self.chunks_per_buffer
+        return self._read(self._chunk_bytes)
     
-    def _is_silence(self, audio_data: bytes) -> bool:
+    def _is_silence(self, audio_data: Union[bytes, memoryview]) -> bool:
         """
         Detect if audio chunk contains silence using energy-based VAD
         
@@ -202,23 +324,15 @@ class AudioBuffer:
             if not audio_data or len(audio_data) == 0:
                 return False
             
-            # Convert bytes to numpy array
-            # Note: Twilio sends μ-law encoded audio, needs conversion
+            # Decode μ-law bytes to per-sample energy via lookup table
             audio_array = np.frombuffer(audio_data, dtype=np.uint8)
-            
-            # Handle arrays with no data
-            if len(audio_array) == 0:
-                return False
-            
-            # Simple energy-based VAD
-            # Calculate energy (sum of squares)
-            energy = np.sum(audio_array.astype(float) ** 2) / len(audio_array)
-            
-            # Normalize energy (8-bit audio max value is 255)
-            normalized_energy = energy / (255.0 ** 2)
-            
-            # Update speech state with hysteresis
-            is_silence = normalized_energy < self.silence_threshold
+            if _mulaw_silence is not None:
+                is_silence = _mulaw_silence(
+                    audio_array, self._mulaw_energy_lut, self._silence_threshold_energy
+                )
+            else:
+                energy = float(self._mulaw_energy_lut[audio_array].mean())
+                is_silence = energy < self._silence_threshold_energy
             
             # Add hysteresis to prevent rapid state changes
             if is_silence:
@@ -230,7 +344,7 @@ class AudioBuffer:
             return bool(is_silence)
             
         except Exception as e:
-            logger.error(f"Error in silence detection: {e}")
+            logger.error("Error in silence detection: %s", e)
             return False
     
     async def flush(self) -> Optional[bytes]:
@@ -240,57 +354,32 @@ class AudioBuffer:
         Returns:
             Remaining audio bytes or None if buffer is empty
         """
-        async with self._lock:
-            if not self.buffer and not self.overflow_buffer:
-                return None
-            
-            # Collect all remaining chunks
-            remaining_chunks = []
+        if not self._size:
+            return None
+        
+        try:
+            self.total_chunks_processed += self._frames(self._size)
+            remaining = self._read(self._size)
             
-            try:
-                # Add overflow buffer first
-                if self.overflow_buffer:
-                    remaining_chunks.extend(self.overflow_buffer)
-                    self.overflow_buffer.clear()
-                
-                # Add all buffered chunks
-                while self.buffer:
-                    audio_data, _ = self.buffer.popleft()
-                    remaining_chunks.append(audio_data)
-                    self.total_chunks_processed += 1
-                
-                if not remaining_chunks:
-                    return None
-                
-                logger.info(f"Flushing {len(remaining_chunks)} remaining audio chunks")
-                result = b''.join(remaining_chunks)
-                
-                # Clear the list to free memory
-                remaining_chunks.clear()
-                
-                return result
-            except Exception as e:
-                logger.error(f"Error flushing audio buffer: {e}")
-                # Clear buffers on error to prevent memory leak
-                self.buffer.clear()
-                self.overflow_buffer.clear()
-                remaining_chunks.clear()
-                return None
+            logger.info("Flushing %d bytes of remaining audio", len(remaining))
+            return remaining
+        except Exception as e:
+            logger.error("Error flushing audio buffer: %s", e)
+            # Clear buffers on error to prevent memory leak
+            self._head = self._size = 0
+            return None
     
     async def clear(self):
         """Clear the buffer"""
-        async with self._lock:
-            self.buffer.clear()
-            self.overflow_buffer.clear()
-            self.silence_chunks = 0
-            self.is_speech_active = False
-            self.consecutive_speech_chunks = 0
-            logger.debug("Audio buffer cleared")
+        self._head = self._size = 0
+        self.silence_chunks = 0
+        self.is_speech_active = False
+        self.consecutive_speech_chunks = 0
+        logger.debug("Audio buffer cleared")
     
     def clear_sync(self):
         """Synchronous version of clear"""
-        self.buffer.clear()
-        self.overflow_buffer.clear()
+        self._head = self._size = 0
         self.silence_chunks = 0
         self.is_speech_active = False
         self.consecutive_speech_chunks = 0
@@ -302,16 +391,15 @@ class AudioBuffer:
         Returns:
             Dictionary with buffer stats
         """
-        async with self._lock:
-            return {
-                "buffer_size": len(self.buffer),
-                "chunks_received": self.total_chunks_received,
-                "chunks_processed": self.total_chunks_processed,
-                "is_speech_active": self.is_speech_active,
-                "silence_chunks": self.silence_chunks,
-                "buffer_duration_ms": len(self.buffer) * self.chunk_duration_ms
-            }
+        return {
+            "buffer_size": len(self),
+            "chunks_received": self.total_chunks_received,
+            "chunks_processed": self.total_chunks_processed,
+            "is_speech_active": self.is_speech_active,
+            "silence_chunks": self.silence_chunks,
+            "buffer_duration_ms": self._size * 1000 // self.sample_rate
+        }
     
     def __len__(self) -> int:
-        """Get current buffer size"""
-        return len(self.buffer)
\ No newline at end of file
+        """Get current buffer size in frames"""
+        return self._frames(self._size)
\ No newline at end of file
@@ -3,14 +3,27 @@ Conversation state management for phone calls
 Tracks state, history, and context for ongoing conversations
 """
 import asyncio
+import sys
+import time
+from collections import deque
+from itertools import islice
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+from dataclasses import dataclass, field, fields
 from enum import Enum
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Try to import orjson for fast serialization, falling back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class CallStatus(Enum):
     """Call status enumeration"""
@@ -60,19 +73,34 @@ class ConversationIntent(Enum):
     
     def _get_category(self) -> str:
         """Get intent category"""
-        if "appointment" in self.value:
-            return "appointment"
-        elif "inquiry" in self.value and self.value != "general_inquiry":
-            return "dental_service"
-        elif self in [self.EMERGENCY, self.PAIN_COMPLAINT]:
-            return "urgent"
-        elif self in [self.COMPLAINT, self.FEEDBACK]:
-            return "feedback"
-        else:
-            return "general"
+        return _INTENT_CATEGORY[self]
+
+
+def _classify_intent(intent: ConversationIntent) -> str:
+    """Derive an intent's category from its value"""
+    if "appointment" in intent.value:
+        return "appointment"
+    elif "inquiry" in intent.value and intent is not ConversationIntent.GENERAL_INQUIRY:
+        return "dental_service"
+    elif intent in (ConversationIntent.EMERGENCY, ConversationIntent.PAIN_COMPLAINT):
+        return "urgent"
+    elif intent in (ConversationIntent.COMPLAINT, ConversationIntent.FEEDBACK):
+        return "feedback"
+    else:
+        return "general"
+
+
+# Categories are fixed per member, so they are classified once at import
+_INTENT_CATEGORY: Dict[ConversationIntent, str] = {
+    intent: _classify_intent(intent) for intent in ConversationIntent
+}
+
 
+# Shared read-only mapping for the common turn without extracted entities
+_NO_ENTITIES: Mapping[str, Any] = MappingProxyType({})
 
-@dataclass
+
+@dataclass(slots=True)
 class ConversationTurn:
     """Represents a single turn in the conversation"""
     timestamp: datetime
@@ -80,10 +108,10 @@ class ConversationTurn:
     text: str
     confidence: Optional[float] = None
     intent: Optional[ConversationIntent] = None
-    entities: Dict[str, Any] = field(default_factory=dict)
+    entities: Mapping[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class AppointmentContext:
     """Context for appointment-related conversations"""
     appointment_type: Optional[str] = None
@@ -97,12 +125,40 @@ class AppointmentContext:
     confirmed: bool = False
 
 
+# Turns retained for LLM context; older turns only survive as transcript lines
+MAX_HISTORY_TURNS = 64
+
+# Evicted turns kept as transcript lines; anything older is only counted
+MAX_ARCHIVED_TURNS = 1024
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """ISO-8601 string for a datetime, passing None through"""
+    return value.isoformat() if value else None
+
+
+# Field names accepted by update_appointment_context
+_APPOINTMENT_FIELDS = frozenset(f.name for f in fields(AppointmentContext))
+
+# Read-only stand-in used when serializing calls that never touched the context
+_EMPTY_APPOINTMENT_CONTEXT = AppointmentContext()
+
+
 class ConversationState:
     """
     Manages the state of a phone conversation
     Tracks history, context, and intent throughout the call
     """
     
+    __slots__ = (
+        'call_sid', 'stream_id', 'from_number', 'to_number', 'client_id',
+        'start_time', 'end_time', '_start_ns', '_end_ns', 'status', 'twilio_stream_sid',
+        'conversation_history', '_archive', '_turn_count', 'current_intent', '_appointment_context',
+        'is_on_hold', 'hold_music_playing', 'transfer_target',
+        '_transcript_queue', '_transcript_event', '_rt_sum', '_rt_count',
+        'interruption_count', '_context_variables', 'conversation_summary',
+    )
+    
     def __init__(
         self,
         call_sid: str,
@@ -130,13 +186,18 @@ class ConversationState:
         # Call metadata
         self.start_time = datetime.utcnow()
         self.end_time: Optional[datetime] = None
+        self._start_ns = time.monotonic_ns()  # Monotonic clock for duration math
+        self._end_ns: Optional[int] = None
         self.status = CallStatus.INITIATED
         self.twilio_stream_sid: Optional[str] = None
         
         # Conversation history
-        self.conversation_history: List[ConversationTurn] = []
+        # Recent turns are kept whole; older ones are archived as formatted lines
+        self.conversation_history: Deque[ConversationTurn] = deque(maxlen=MAX_HISTORY_TURNS)
+        self._archive: Deque[str] = deque(maxlen=MAX_ARCHIVED_TURNS)
+        self._turn_count = 0
         self.current_intent = ConversationIntent.UNKNOWN
-        self.appointment_context = AppointmentContext()
+        self._appointment_context: Optional[AppointmentContext] = None  # Created on first use
         
         # State management
         self.is_on_hold = False
@@ -144,15 +205,40 @@ class ConversationState:
         self.transfer_target: Optional[str] = None
         
         # Performance tracking
-        self.transcript_queue: asyncio.Queue = asyncio.Queue()
-        self.response_times: List[float] = []
+        # Single producer (STT) / single consumer transcript stream, created on first use
+        self._transcript_queue: Optional[Deque[str]] = None
+        self._transcript_event: Optional[asyncio.Event] = None
+        self._rt_sum = 0.0  # Running response time total (ms)
+        self._rt_count = 0
         self.interruption_count = 0
         
         # Context and memory
-        self.context_variables: Dict[str, Any] = {}
+        self._context_variables: Optional[Dict[str, Any]] = None  # Created on first use
         self.conversation_summary: Optional[str] = None
         
-        logger.info(f"Initialized conversation state for call {call_sid}")
+        logger.info("Initialized conversation state for call %s", call_sid)
+    
+    @property
+    def appointment_context(self) -> AppointmentContext:
+        """Appointment details gathered during the call"""
+        if self._appointment_context is None:
+            self._appointment_context = AppointmentContext()
+        return self._appointment_context
+    
+    @property
+    def transcript_queue(self) -> Deque[str]:
+        """Transcripts waiting to be consumed"""
+        if self._transcript_queue is None:
+            self._transcript_queue = deque()
+            self._transcript_event = asyncio.Event()
+        return self._transcript_queue
+    
+    @property
+    def context_variables(self) -> Dict[str, Any]:
+        """Free-form context carried across turns"""
+        if self._context_variables is None:
+            self._context_variables = {}
+        return self._context_variables
     
     def add_turn(
         self,
@@ -172,21 +258,22 @@ class ConversationState:
             intent: Detected intent
             entities: Extracted entities (dates, names, etc.)
         """
+        # Positional in field order: timestamp, speaker, text, confidence, intent, entities
         turn = ConversationTurn(
-            timestamp=datetime.utcnow(),
-            speaker=speaker,
-            text=text,
-            confidence=confidence,
-            intent=intent,
-            entities=entities or {}
+            datetime.utcnow(), sys.intern(speaker), text, confidence, intent, entities or _NO_ENTITIES
         )
         
-        self.conversation_history.append(turn)
+        history = self.conversation_history
+        if len(history) == MAX_HISTORY_TURNS:
+            evicted = history[0]
+            self._archive.append(f"{evicted.speaker}: {evicted.text}")
+        history.append(turn)
+        self._turn_count += 1
         
         # Update current intent if provided
-        if intent and intent != ConversationIntent.UNKNOWN:
+        if intent is not None and intent is not ConversationIntent.UNKNOWN:
             self.current_intent = intent
-            logger.debug(f"Updated intent to: {intent.value}")
+            logger.debug("Updated intent to: %s", intent.value)
     
     def get_recent_context(self, turns: int = 5) -> List[ConversationTurn]:
         """
@@ -198,11 +285,27 @@ class ConversationState:
         Returns:
             List of recent conversation turns
         """
-        return self.conversation_history[-turns:] if self.conversation_history else []
+        history = self.conversation_history
+        return list(islice(history, max(0, len(history) - turns), None))
+    
+    def get_full_transcript(self) -> str:
+        """
+        Get the whole conversation as text, including archived turns
+        
+        Returns:
+            Formatted conversation text from the first turn, or from the
+            oldest archived turn after a note of how many were dropped
+        """
+        lines = list(self._archive)
+        lines.extend(f"{turn.speaker}: {turn.text}" for turn in self.conversation_history)
+        dropped = self._turn_count - len(lines)
+        if dropped > 0:
+            lines.insert(0, f"[{dropped} earlier turns omitted]")
+        return "\n".join(lines)
     
     def get_conversation_text(self, speaker_filter: Optional[str] = None) -> str:
         """
-        Get the conversation as text
+        Get the retained (most recent MAX_HISTORY_TURNS) conversation as text
         
         Args:
             speaker_filter: Optional filter for specific speaker
@@ -210,13 +313,15 @@ class ConversationState:
         Returns:
             Formatted conversation text
         """
-        turns = self.conversation_history
-        if speaker_filter:
-            turns = [t for t in turns if t.speaker == speaker_filter]
+        if not speaker_filter:
+            return "\n".join([f"{turn.speaker}: {turn.text}" for turn in self.conversation_history])
         
+        # Filter while formatting; interned speakers make the comparison an identity check
+        speaker_filter = sys.intern(speaker_filter)
         return "\n".join([
             f"{turn.speaker}: {turn.text}"
-            for turn in turns
+            for turn in self.conversation_history
+            if turn.speaker == speaker_filter
         ])
     
     def update_appointment_context(self, **kwargs):
@@ -226,10 +331,12 @@ class ConversationState:
         Args:
             **kwargs: Appointment context fields to update
         """
+        appointment = self.appointment_context
         for key, value in kwargs.items():
-            if hasattr(self.appointment_context, key):
-                setattr(self.appointment_context, key, value)
-                logger.debug(f"Updated appointment context: {key} = {value}")
+            if key in _APPOINTMENT_FIELDS:
+                setattr(appointment, key, value)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Updated appointment context: %s = %s", key, value)
     
     def set_status(self, status: CallStatus):
         """
@@ -240,22 +347,46 @@ class ConversationState:
         """
         old_status = self.status
         self.status = status
-        logger.info(f"Call {self.call_sid} status changed: {old_status.value} -> {status.value}")
+        logger.info("Call %s status changed: %s -> %s", self.call_sid, old_status.value, status.value)
         
         if status == CallStatus.COMPLETED:
             self.end_time = datetime.utcnow()
+            self._end_ns = time.monotonic_ns()
     
     def put_on_hold(self):
         """Put the call on hold"""
         self.is_on_hold = True
         self.hold_music_playing = True
-        logger.info(f"Call {self.call_sid} put on hold")
+        logger.info("Call %s put on hold", self.call_sid)
     
     def resume_from_hold(self):
         """Resume the call from hold"""
         self.is_on_hold = False
         self.hold_music_playing = False
-        logger.info(f"Call {self.call_sid} resumed from hold")
+        logger.info("Call %s resumed from hold", self.call_sid)
+    
+    def push_transcript(self, transcript: str):
+        """
+        Queue a transcript for the consumer and wake it if waiting
+        
+        Args:
+            transcript: Transcribed caller speech
+        """
+        self.transcript_queue.append(transcript)
+        self._transcript_event.set()
+    
+    async def next_transcript(self) -> str:
+        """
+        Wait for and return the next queued transcript
+        
+        Returns:
+            Oldest transcript not yet consumed
+        """
+        queue = self.transcript_queue
+        while not queue:
+            self._transcript_event.clear()
+            await self._transcript_event.wait()
+        return queue.popleft()
     
     def record_response_time(self, response_time: float):
         """
@@ -264,7 +395,8 @@ class ConversationState:
         Args:
             response_time: Response time in milliseconds
         """
-        self.response_times.append(response_time)
+        self._rt_sum += response_time
+        self._rt_count += 1
     
     def get_average_response_time(self) -> float:
         """
@@ -273,9 +405,7 @@ class ConversationState:
         Returns:
             Average response time in milliseconds
         """
-        if not self.response_times:
-            return 0.0
-        return sum(self.response_times) / len(self.response_times)
+        return self._rt_sum / self._rt_count if self._rt_count else 0.0
     
     def increment_interruptions(self):
         """Increment interruption counter"""
@@ -288,8 +418,8 @@ class ConversationState:
         Returns:
             Duration in seconds
         """
-        end = self.end_time or datetime.utcnow()
-        return (end - self.start_time).total_seconds()
+        end_ns = self._end_ns or time.monotonic_ns()
+        return (end_ns - self._start_ns) / 1e9
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -298,26 +428,55 @@ class ConversationState:
         Returns:
             Dictionary representation of state
         """
+        return self._snapshot(_isoformat)
+    
+    def to_json(self) -> bytes:
+        """
+        Serialize state to JSON, encoding datetimes natively when orjson is available
+        
+        Returns:
+            UTF-8 encoded JSON with the same shape as to_dict()
+        """
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self._snapshot(None))
+        return json.dumps(self.to_dict(), separators=(',', ':')).encode('utf-8')
+    
+    def _snapshot(self, encode_datetime: Optional[Callable[[Optional[datetime]], Any]]) -> Dict[str, Any]:
+        """
+        Build the serializable view of the state
+        
+        Args:
+            encode_datetime: Converter applied to datetime fields, or None to keep them raw
+            
+        Returns:
+            Dictionary representation of state
+        """
+        appointment = self._appointment_context or _EMPTY_APPOINTMENT_CONTEXT
+        start_time, end_time, preferred_date = self.start_time, self.end_time, appointment.preferred_date
+        if encode_datetime is not None:
+            start_time = encode_datetime(start_time)
+            end_time = encode_datetime(end_time)
+            preferred_date = encode_datetime(preferred_date)
         return {
             "call_sid": self.call_sid,
             "stream_id": self.stream_id,
             "from_number": self.from_number,
             "to_number": self.to_number,
             "client_id": self.client_id,
-            "start_time": self.start_time.isoformat(),
-            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "start_time": start_time,
+            "end_time": end_time,
             "status": self.status.value,
             "duration_seconds": self.get_call_duration(),
             "current_intent": self.current_intent.value,
             "appointment_context": {
-                "appointment_type": self.appointment_context.appointment_type,
-                "preferred_date": self.appointment_context.preferred_date.isoformat() if self.appointment_context.preferred_date else None,
-                "preferred_time": self.appointment_context.preferred_time,
-                "patient_name": self.appointment_context.patient_name,
-                "confirmed": self.appointment_context.confirmed
+                "appointment_type": appointment.appointment_type,
+                "preferred_date": preferred_date,
+                "preferred_time": appointment.preferred_time,
+                "patient_name": appointment.patient_name,
+                "confirmed": appointment.confirmed
             },
-            "conversation_turns": len(self.conversation_history),
+            "conversation_turns": self._turn_count,
             "average_response_time": self.get_average_response_time(),
             "interruption_count": self.interruption_count,
             "summary": self.conversation_summary
-        }
\ No newline at end of file
+        }
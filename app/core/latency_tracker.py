@@ -4,23 +4,116 @@ Tracks response times throughout the audio pipeline
 """
 import time
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_left, insort
+from itertools import chain
+from typing import Dict, Iterator, Optional, Any
+from dataclasses import InitVar, dataclass, field
 from datetime import datetime
-import statistics
 
 logger = logging.getLogger(__name__)
 
+# Latencies are measured as perf_counter_ns deltas and reported in milliseconds
+_NS_PER_MS = 1_000_000
+_HIGH_LATENCY_NS = 1500 * _NS_PER_MS  # More than 1.5 seconds
+_HIGH_LATENCY_WARN_INTERVAL_NS = 5_000 * _NS_PER_MS  # At most one warning per metric per 5s
+
+# Media frames arrive every 20ms, so per-frame events are counted and
+# timestamped on every call but only recorded as metrics on every 64th frame
+# (about once every 1.3s)
+_FRAME_SAMPLE_MASK = 63
+
+
+class MetricWindow:
+    """
+    Rolling window of the most recent latency samples with O(1) statistics
+    
+    Samples are integer nanoseconds, kept in a ring buffer in arrival order
+    (for eviction) and in sorted order (for min, max and median); a running
+    total gives the mean. Both orders are stored as packed int64 arrays
+    rather than lists of boxed ints. Statistics are reported in milliseconds.
+    """
+    
+    __slots__ = ('_ring', '_sorted', '_head', '_capacity', '_total')
+    
+    def __init__(self, max_samples: int):
+        self._ring = array('q')
+        self._sorted = array('q')
+        self._head = 0  # Index of the oldest sample once the ring is full
+        self._capacity = max_samples
+        self._total = 0
+    
+    def append(self, value: int):
+        """
+        Add a sample, evicting the oldest once the window is full
+        
+        Args:
+            value: Latency in nanoseconds
+        """
+        ring = self._ring
+        if len(ring) < self._capacity:
+            ring.append(value)
+        elif self._capacity:
+            head = self._head
+            evicted = ring[head]
+            del self._sorted[bisect_left(self._sorted, evicted)]
+            self._total -= evicted
+            ring[head] = value
+            self._head = (head + 1) % self._capacity
+        else:
+            return
+        insort(self._sorted, value)
+        self._total += value
+    
+    def summary(self) -> Dict[str, float]:
+        """
+        Get summary statistics for the window
+        
+        Returns:
+            Dictionary with mean, median, min, max (milliseconds) and count
+        """
+        ordered = self._sorted
+        count = len(ordered)
+        if not count:
+            return {"mean": 0.0, "median": 0.0, "min": 0.0, "max": 0.0, "count": 0}
+        
+        mid = count // 2
+        median = ordered[mid] if count % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+        return {
+            "mean": self._total / count / _NS_PER_MS,
+            "median": median / _NS_PER_MS,
+            "min": ordered[0] / _NS_PER_MS,
+            "max": ordered[-1] / _NS_PER_MS,
+            "count": count
+        }
+    
+    def __len__(self) -> int:
+        return len(self._ring)
+    
+    def __iter__(self) -> Iterator[int]:
+        # Oldest first: the ring wraps at _head once full
+        head = self._head
+        return chain(self._ring[head:], self._ring[:head])
+
 
 @dataclass
 class LatencyMetrics:
-    """Container for latency metrics"""
-    audio_receive_times: List[float] = field(default_factory=list)
-    transcript_process_times: List[float] = field(default_factory=list)
-    response_generation_times: List[float] = field(default_factory=list)
-    tts_generation_times: List[float] = field(default_factory=list)
-    audio_send_times: List[float] = field(default_factory=list)
-    end_to_end_times: List[float] = field(default_factory=list)
+    """Container for latency metrics, each keeping the most recent max_samples values"""
+    max_samples: InitVar[int] = 1000
+    audio_receive_times: MetricWindow = field(init=False)
+    transcript_process_times: MetricWindow = field(init=False)
+    response_generation_times: MetricWindow = field(init=False)
+    tts_generation_times: MetricWindow = field(init=False)
+    audio_send_times: MetricWindow = field(init=False)
+    end_to_end_times: MetricWindow = field(init=False)
+    
+    def __post_init__(self, max_samples: int):
+        self.audio_receive_times = MetricWindow(max_samples)
+        self.transcript_process_times = MetricWindow(max_samples)
+        self.response_generation_times = MetricWindow(max_samples)
+        self.tts_generation_times = MetricWindow(max_samples)
+        self.audio_send_times = MetricWindow(max_samples)
+        self.end_to_end_times = MetricWindow(max_samples)
     
     def get_summary(self) -> Dict[str, Dict[str, float]]:
         """
@@ -29,36 +122,14 @@ class LatencyMetrics:
         Returns:
             Dictionary with mean, median, min, max for each metric
         """
-        summary = {}
-        
-        metric_names = {
-            "audio_receive": self.audio_receive_times,
-            "transcript_process": self.transcript_process_times,
-            "response_generation": self.response_generation_times,
-            "tts_generation": self.tts_generation_times,
-            "audio_send": self.audio_send_times,
-            "end_to_end": self.end_to_end_times
+        return {
+            "audio_receive": self.audio_receive_times.summary(),
+            "transcript_process": self.transcript_process_times.summary(),
+            "response_generation": self.response_generation_times.summary(),
+            "tts_generation": self.tts_generation_times.summary(),
+            "audio_send": self.audio_send_times.summary(),
+            "end_to_end": self.end_to_end_times.summary()
         }
-        
-        for name, times in metric_names.items():
-            if times:
-                summary[name] = {
-                    "mean": statistics.mean(times),
-                    "median": statistics.median(times),
-                    "min": min(times),
-                    "max": max(times),
-                    "count": len(times)
-                }
-            else:
-                summary[name] = {
-                    "mean": 0.0,
-                    "median": 0.0,
-                    "min": 0.0,
-                    "max": 0.0,
-                    "count": 0
-                }
-        
-        return summary
 
 
 class LatencyTracker:
@@ -76,19 +147,28 @@ class LatencyTracker:
         """
         self.stream_id = stream_id
         self.max_samples = max_samples
-        self.metrics = LatencyMetrics()
+        self.metrics = LatencyMetrics(max_samples)
         
         # Timing markers for ongoing operations
-        self.markers: Dict[str, float] = {}
+        self.markers: Dict[str, int] = {}
         
-        # Track pipeline stages
-        self.audio_received_at: Optional[float] = None
-        self.transcript_started_at: Optional[float] = None
-        self.response_started_at: Optional[float] = None
-        self.tts_started_at: Optional[float] = None
-        self.audio_sent_at: Optional[float] = None
+        # Track pipeline stages (perf_counter_ns timestamps)
+        self.audio_received_at: Optional[int] = None
+        self.transcript_started_at: Optional[int] = None
+        self.response_started_at: Optional[int] = None
+        self.tts_started_at: Optional[int] = None
+        self.audio_sent_at: Optional[int] = None
+        self._last_audio_sent_at: Optional[int] = None
         
-        logger.info(f"LatencyTracker initialized for stream {stream_id}")
+        # Media frame counters (per-frame metrics are sampled from these)
+        self.frames_received = 0
+        self.frames_sent = 0
+        
+        # High-latency warnings are rate limited per metric
+        self._last_warned_at: Dict[str, int] = {}
+        self._suppressed_warnings: Dict[str, int] = {}
+        
+        logger.info("LatencyTracker initialized for stream %s", stream_id)
     
     def mark(self, marker_name: str):
         """
@@ -97,7 +177,7 @@ class LatencyTracker:
         Args:
             marker_name: Name of the marker
         """
-        self.markers[marker_name] = time.time()
+        self.markers[marker_name] = time.perf_counter_ns()
     
     def measure(self, start_marker: str, end_marker: str) -> Optional[float]:
         """
@@ -116,86 +196,93 @@ class LatencyTracker:
         if start is None or end is None:
             return None
         
-        return (end - start) * 1000  # Convert to milliseconds
+        return (end - start) / _NS_PER_MS
     
     def record_audio_received(self):
-        """Record when audio is received from Twilio"""
-        now = time.time()
+        """Record when audio is received from Twilio (metric sampled every 64 frames)"""
+        now = time.perf_counter_ns()
         self.audio_received_at = now
+        count = self.frames_received
+        self.frames_received = count + 1
+        if count & _FRAME_SAMPLE_MASK:
+            return
         
         # If we have a complete cycle, calculate end-to-end latency
-        if hasattr(self, '_last_audio_sent_at'):
-            end_to_end = (now - self._last_audio_sent_at) * 1000
-            self._add_metric('end_to_end_times', end_to_end)
+        if self._last_audio_sent_at is not None:
+            self._add_metric('end_to_end_times', now - self._last_audio_sent_at)
     
     def record_transcript_started(self):
         """Record when transcript processing starts"""
-        now = time.time()
+        now = time.perf_counter_ns()
         self.transcript_started_at = now
         
-        if self.audio_received_at:
-            latency = (now - self.audio_received_at) * 1000
-            self._add_metric('audio_receive_times', latency)
+        if self.audio_received_at is not None:
+            self._add_metric('audio_receive_times', now - self.audio_received_at)
     
     def record_transcript_processed(self):
         """Record when transcript processing completes"""
-        now = time.time()
+        now = time.perf_counter_ns()
         
-        if self.transcript_started_at:
-            latency = (now - self.transcript_started_at) * 1000
-            self._add_metric('transcript_process_times', latency)
+        if self.transcript_started_at is not None:
+            self._add_metric('transcript_process_times', now - self.transcript_started_at)
             self.response_started_at = now
     
     def record_response_generated(self):
         """Record when AI response is generated"""
-        now = time.time()
+        now = time.perf_counter_ns()
         
-        if self.response_started_at:
-            latency = (now - self.response_started_at) * 1000
-            self._add_metric('response_generation_times', latency)
+        if self.response_started_at is not None:
+            self._add_metric('response_generation_times', now - self.response_started_at)
             self.tts_started_at = now
     
     def record_tts_generated(self):
         """Record when TTS audio is generated"""
-        now = time.time()
+        now = time.perf_counter_ns()
         
-        if self.tts_started_at:
-            latency = (now - self.tts_started_at) * 1000
-            self._add_metric('tts_generation_times', latency)
+        if self.tts_started_at is not None:
+            self._add_metric('tts_generation_times', now - self.tts_started_at)
     
     def record_audio_sent(self):
-        """Record when audio is sent back to Twilio"""
-        now = time.time()
+        """Record when audio is sent back to Twilio (metrics sampled every 64 frames)"""
+        now = time.perf_counter_ns()
         self.audio_sent_at = now
         self._last_audio_sent_at = now
+        count = self.frames_sent
+        self.frames_sent = count + 1
+        if count & _FRAME_SAMPLE_MASK:
+            return
         
-        if self.tts_started_at:
-            latency = (now - self.tts_started_at) * 1000
-            self._add_metric('audio_send_times', latency)
+        if self.tts_started_at is not None:
+            self._add_metric('audio_send_times', now - self.tts_started_at)
         
         # Calculate total response time
-        if self.audio_received_at:
-            total_latency = (now - self.audio_received_at) * 1000
-            logger.debug(f"Total response latency: {total_latency:.2f}ms")
+        if self.audio_received_at is not None and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Total response latency: %.2fms", (now - self.audio_received_at) / _NS_PER_MS)
     
-    def _add_metric(self, metric_name: str, value: float):
+    def _add_metric(self, metric_name: str, value: int):
         """
-        Add a metric value, maintaining max samples limit
+        Add a metric value; the window drops the oldest past max samples
         
         Args:
-            metric_name: Name of the metric list
-            value: Value to add
+            metric_name: Name of the metric window
+            value: Latency in nanoseconds
         """
-        metric_list = getattr(self.metrics, metric_name)
-        metric_list.append(value)
+        getattr(self.metrics, metric_name).append(value)
         
-        # Trim to max samples
-        if len(metric_list) > self.max_samples:
-            metric_list.pop(0)
-        
-        # Log if latency is high
-        if value > 1500:  # More than 1.5 seconds
-            logger.warning(f"High latency detected for {metric_name}: {value:.2f}ms")
+        # Log if latency is high, at most once per interval for each metric
+        if value > _HIGH_LATENCY_NS:
+            now = time.perf_counter_ns()
+            last = self._last_warned_at.get(metric_name)
+            if last is not None and now - last < _HIGH_LATENCY_WARN_INTERVAL_NS:
+                self._suppressed_warnings[metric_name] = self._suppressed_warnings.get(metric_name, 0) + 1
+                return
+            
+            self._last_warned_at[metric_name] = now
+            suppressed = self._suppressed_warnings.pop(metric_name, 0)
+            logger.warning(
+                "High latency detected for %s: %.2fms (%d similar warnings suppressed)",
+                metric_name, value / _NS_PER_MS, suppressed
+            )
     
     def get_metrics(self) -> Dict[str, Any]:
         """
@@ -215,17 +302,22 @@ class LatencyTracker:
             "stream_id": self.stream_id,
             "timestamp": datetime.utcnow().isoformat(),
             "avg_response_time": avg_response_time,
+            "frames_received": self.frames_received,
+            "frames_sent": self.frames_sent,
             "metrics_summary": summary,
             "active_markers": list(self.markers.keys())
         }
     
     def reset(self):
         """Reset all metrics and markers"""
-        self.metrics = LatencyMetrics()
+        self.metrics = LatencyMetrics(self.max_samples)
         self.markers.clear()
         self.audio_received_at = None
         self.transcript_started_at = None
         self.response_started_at = None
         self.tts_started_at = None
         self.audio_sent_at = None
-        logger.debug(f"LatencyTracker reset for stream {self.stream_id}")
\ No newline at end of file
+        self._last_audio_sent_at = None
+        self.frames_received = 0
+        self.frames_sent = 0
+        logger.debug("LatencyTracker reset for stream %s", self.stream_id)
\ No newline at end of file
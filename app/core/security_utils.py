@@ -2,35 +2,62 @@
 Security utilities for encryption, decryption, and data sanitization
 HIPAA-compliant data handling for PHI (Protected Health Information)
 """
+import asyncio
 import base64
+import binascii
 import hashlib
 import hmac
+import os
 import re
 import secrets
 import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from functools import wraps
-from typing import Any, Dict, Optional, Union, Callable
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import logging
 
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.utils.expiring_keys import ExpiringKeys
 
 logger = logging.getLogger(__name__)
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# AES-GCM token layout: version byte + 96-bit nonce + ciphertext/tag.
+# Legacy Fernet tokens always start with version byte 0x80.
+_AESGCM_VERSION = b"\x01"
+_AESGCM_NONCE_SIZE = 12
+_FERNET_VERSION = 0x80
+
+# Minimum items per worker before rotate_key fans out to a thread pool
+_ROTATE_CHUNK_MIN = 512
+
+# Precompiled patterns for masking and validation helpers
+_NON_DIGIT = re.compile(r'\D')
+_PHONE_CLEAN = re.compile(r'[\s\-\(\)\+\.]')
+_PHONE_VALID = re.compile(r'^\d{10,15}$')
+_EMAIL_VALID = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_API_KEY_PATTERN = re.compile(r'(sk_test|sk_live)_([A-Za-z0-9]{32})_([0-9a-f]{8})')
+
 
 class EncryptionManager:
     """
     Manages encryption and decryption of sensitive data
-    Uses Fernet symmetric encryption with key from environment
+    Uses AES-256-GCM with a key derived from the Fernet key in the environment;
+    tokens written by earlier Fernet-based releases still decrypt
     """
     
     def __init__(self, key: Optional[str] = None):
@@ -89,12 +116,23 @@ class EncryptionManager:
         
         try:
             # Ensure key is valid
-            self.fernet = Fernet(key_str.encode() if isinstance(key_str, str) else key_str)
+            key_bytes = key_str.encode() if isinstance(key_str, str) else key_str
+            self.fernet = Fernet(key_bytes)
         except Exception as e:
             raise ValueError(f"Invalid encryption key format: {e}")
         
-        # Track encryption operations for audit
+        # Derive a separate AES-GCM key so the Fernet key material is not reused
+        aead_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"siphio-phi-aesgcm-v1",
+        ).derive(base64.urlsafe_b64decode(key_bytes))
+        self._aesgcm = AESGCM(aead_key)
+        
+        # Track encryption operations for audit; the flag is fixed at startup
         self.operation_count = 0
+        self._audit_enabled = settings.AUDIT_LOG_ENABLED
     
     def _is_valid_fernet_key(self, key_str: str) -> bool:
         """
@@ -116,6 +154,52 @@ class EncryptionManager:
         except Exception:
             return False
     
+    def _seal(self, data: bytes) -> bytes:
+        """
+        Encrypt bytes into a urlsafe-base64 AES-GCM token
+        
+        Args:
+            data: Plaintext bytes
+            
+        Returns:
+            Encoded token bytes
+        """
+        # Single AES-GCM pass; the version byte is bound as associated data
+        nonce = os.urandom(_AESGCM_NONCE_SIZE)
+        ciphertext = self._aesgcm.encrypt(nonce, data, _AESGCM_VERSION)
+        return base64.urlsafe_b64encode(_AESGCM_VERSION + nonce + ciphertext)
+    
+    def _open(self, token: bytes) -> bytes:
+        """
+        Decrypt an AES-GCM or legacy Fernet token
+        
+        Args:
+            token: Encoded token bytes
+            
+        Returns:
+            Plaintext bytes
+            
+        Raises:
+            InvalidToken: If the token is malformed or fails authentication
+        """
+        try:
+            blob = base64.urlsafe_b64decode(token)
+        except (binascii.Error, ValueError):
+            raise InvalidToken
+        
+        if blob[:1] == _AESGCM_VERSION:
+            nonce_end = 1 + _AESGCM_NONCE_SIZE
+            try:
+                return self._aesgcm.decrypt(
+                    blob[1:nonce_end], blob[nonce_end:], _AESGCM_VERSION
+                )
+            except (InvalidTag, ValueError):
+                raise InvalidToken
+        if blob and blob[0] == _FERNET_VERSION:
+            # Legacy token written before the AES-GCM switch
+            return self.fernet.decrypt(token)
+        raise InvalidToken
+    
     def encrypt(self, data: Union[str, bytes]) -> str:
         """
         Encrypt data and return base64 encoded string
@@ -134,19 +218,44 @@ class EncryptionManager:
             if isinstance(data, str):
                 data = data.encode('utf-8')
             
-            # Encrypt and decode to string
-            encrypted = self.fernet.encrypt(data)
+            encrypted = self._seal(data)
             self.operation_count += 1
             
             # Log operation (without sensitive data)
-            if settings.AUDIT_LOG_ENABLED:
-                logger.debug(f"Encrypted data (operation #{self.operation_count})")
+            if self._audit_enabled and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Encrypted data (operation #%d)", self.operation_count)
             
             return encrypted.decode('utf-8')
         except Exception as e:
             logger.error(f"Encryption failed: {e}")
             raise
     
+    def encrypt_many(self, values: Iterable[Union[str, bytes]]) -> List[str]:
+        """
+        Encrypt several values in one call, e.g. all PHI fields of a record
+        
+        Args:
+            values: Strings or bytes to encrypt (empty values map to "")
+            
+        Returns:
+            Base64 encoded encrypted strings in input order
+        """
+        try:
+            encrypted = [
+                self._seal(v.encode('utf-8') if isinstance(v, str) else v).decode('utf-8')
+                if v else ""
+                for v in values
+            ]
+        except Exception as e:
+            logger.error(f"Encryption failed: {e}")
+            raise
+        
+        self.operation_count += len(encrypted)
+        if self._audit_enabled and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Encrypted %d values (operation #%d)", len(encrypted), self.operation_count)
+        
+        return encrypted
+    
     def decrypt(self, encrypted_data: Union[str, bytes]) -> str:
         """
         Decrypt data and return original string
@@ -165,13 +274,12 @@ class EncryptionManager:
             if isinstance(encrypted_data, str):
                 encrypted_data = encrypted_data.encode('utf-8')
             
-            # Decrypt
-            decrypted = self.fernet.decrypt(encrypted_data)
+            decrypted = self._open(encrypted_data)
             self.operation_count += 1
             
             # Log operation (without sensitive data)
-            if settings.AUDIT_LOG_ENABLED:
-                logger.debug(f"Decrypted data (operation #{self.operation_count})")
+            if self._audit_enabled and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Decrypted data (operation #%d)", self.operation_count)
             
             return decrypted.decode('utf-8')
         except InvalidToken:
@@ -181,10 +289,72 @@ class EncryptionManager:
             logger.error(f"Decryption failed: {e}")
             raise
     
+    def decrypt_many(self, values: Iterable[Union[str, bytes]]) -> List[str]:
+        """
+        Decrypt several values in one call
+        
+        Args:
+            values: Base64 encoded encrypted strings or bytes (empty values map to "")
+            
+        Returns:
+            Decrypted strings in input order
+        """
+        try:
+            decrypted = [
+                self._open(v.encode('utf-8') if isinstance(v, str) else v).decode('utf-8')
+                if v else ""
+                for v in values
+            ]
+        except InvalidToken:
+            logger.error("Invalid encryption token - data may be corrupted or key mismatch")
+            raise
+        except Exception as e:
+            logger.error(f"Decryption failed: {e}")
+            raise
+        
+        self.operation_count += len(decrypted)
+        if self._audit_enabled and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Decrypted %d values (operation #%d)", len(decrypted), self.operation_count)
+        
+        return decrypted
+    
+    def _rotate_chunk(
+        self,
+        new_manager: "EncryptionManager",
+        items: List[Tuple[str, str]]
+    ) -> List[Tuple[str, str]]:
+        """
+        Re-encrypt a chunk of (key, token) pairs from this key to a new one
+        
+        Args:
+            new_manager: Manager holding the new key
+            items: (key, encrypted value) pairs
+            
+        Returns:
+            (key, re-encrypted value) pairs
+        """
+        rotated = []
+        for key, encrypted_value in items:
+            try:
+                # Decrypt with old key, encrypt with new key
+                if isinstance(encrypted_value, str):
+                    encrypted_value = encrypted_value.encode('utf-8')
+                plaintext = self._open(encrypted_value) if encrypted_value else b''
+                rotated.append(
+                    (key, new_manager._seal(plaintext).decode('utf-8') if plaintext else "")
+                )
+            except Exception as e:
+                logger.error(f"Failed to rotate key for {key}: {e}")
+                raise
+        return rotated
+    
     def rotate_key(self, new_key: str, old_data: Dict[str, str]) -> Dict[str, str]:
         """
         Rotate encryption key by re-encrypting data with new key
         
+        Large batches are split across a thread pool; the AES work in the
+        cryptography backend releases the GIL, so chunks run in parallel.
+        
         Args:
             new_key: New encryption key
             old_data: Dictionary of encrypted data to rotate
@@ -194,16 +364,25 @@ class EncryptionManager:
         """
         # Create new encryption manager with new key
         new_manager = EncryptionManager(new_key)
-        rotated_data = {}
+        items = list(old_data.items())
+        workers = min(os.cpu_count() or 1, len(items) // _ROTATE_CHUNK_MIN)
         
-        for key, encrypted_value in old_data.items():
-            try:
-                # Decrypt with old key, encrypt with new key
-                decrypted = self.decrypt(encrypted_value)
-                rotated_data[key] = new_manager.encrypt(decrypted)
-            except Exception as e:
-                logger.error(f"Failed to rotate key for {key}: {e}")
-                raise
+        if workers <= 1:
+            rotated_data = dict(self._rotate_chunk(new_manager, items))
+        else:
+            # One contiguous chunk per worker keeps executor overhead per batch, not per item
+            size = -(-len(items) // workers)
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                rotated_data = {}
+                for rotated in executor.map(
+                    lambda chunk: self._rotate_chunk(new_manager, chunk), chunks
+                ):
+                    rotated_data.update(rotated)
+        
+        count = sum(1 for value in old_data.values() if value)
+        self.operation_count += count
+        new_manager.operation_count += count
         
         logger.info(f"Successfully rotated {len(rotated_data)} encrypted values")
         return rotated_data
@@ -218,18 +397,23 @@ def mask_phone(phone: str, show_last: int = 4) -> str:
     """
     Mask phone number showing only last N digits
     
+    US numbers keep the dashed layout only with the default show_last=4,
+    where the visible digits are exactly the line number. Any other
+    show_last yields the generic form, X for each hidden digit followed by
+    the visible digits, whatever the number's length.
+    
     Args:
         phone: Phone number to mask
         show_last: Number of digits to show at the end
         
     Returns:
-        Masked phone number (e.g., "XXX-XXX-1234")
+        Masked phone number (e.g., "XXX-XXX-1234", or "XXXXXXXX34" for show_last=2)
     """
     if not phone:
         return "XXX-XXX-XXXX"  # Return placeholder for empty
     
     # Remove non-digit characters
-    digits_only = re.sub(r'\D', '', phone)
+    digits_only = _NON_DIGIT.sub('', phone)
     
     if not digits_only:
         return "XXX-XXX-XXXX"  # Return placeholder for non-digit input
@@ -237,18 +421,18 @@ def mask_phone(phone: str, show_last: int = 4) -> str:
     if len(digits_only) <= show_last:
         return phone  # Don't mask if too short
     
-    # Mask all but last N digits
-    masked_part = 'X' * (len(digits_only) - show_last)
     visible_part = digits_only[-show_last:]
     
-    # Format as XXX-XXX-1234 for US numbers
-    if len(digits_only) == 10:  # US number without country code
-        return f"{masked_part[:3]}-{masked_part[3:6]}-{visible_part}"
-    elif len(digits_only) == 11 and digits_only[0] == '1':  # US number with country code
-        return f"+1-{masked_part[1:4]}-{masked_part[4:7]}-{visible_part}"
-    else:
-        # Generic masking
-        return masked_part + visible_part
+    # Format as XXX-XXX-1234 for US numbers (mask prefix is constant);
+    # the dashes only line up with the digit groups when 4 digits are shown
+    if show_last == 4:
+        if len(digits_only) == 10:  # US number without country code
+            return f"XXX-XXX-{visible_part}"
+        if len(digits_only) == 11 and digits_only[0] == '1':  # US number with country code
+            return f"+1-XXX-XXX-{visible_part}"
+    
+    # Generic masking of all but last N digits
+    return 'X' * (len(digits_only) - show_last) + visible_part
 
 
 def mask_email(email: str) -> str:
@@ -341,7 +525,7 @@ def mask_ssn(ssn: str) -> str:
         return ""
     
     # Remove non-digit characters
-    digits_only = re.sub(r'\D', '', ssn)
+    digits_only = _NON_DIGIT.sub('', ssn)
     
     if len(digits_only) < 4:
         return 'X' * len(digits_only)
@@ -353,6 +537,36 @@ def mask_ssn(ssn: str) -> str:
         return 'X' * (len(digits_only) - 4) + digits_only[-4:]
 
 
+# Substring -> masker, checked in priority order ("caller_phone" masks as a phone)
+_SENSITIVE_PATTERNS = (
+    ('phone', mask_phone),
+    ('email', mask_email),
+    ('name', mask_name),
+    ('ssn', mask_ssn),
+    ('patient', mask_name),
+    ('caller', mask_name),
+)
+_REDACT_KEYS = frozenset({'password', 'token', 'api_key', 'secret'})
+_TRUNCATE_KEYS = frozenset({'authorization', 'cookie'})
+
+
+@lru_cache(maxsize=1024)
+def _masker_for_key(key_lower: str) -> Optional[Callable[[str], str]]:
+    """
+    Resolve the masking function for a lower-cased log field name
+    
+    Args:
+        key_lower: Lower-cased dictionary key
+        
+    Returns:
+        Masking function, or None if the field is not sensitive
+    """
+    for pattern, mask_func in _SENSITIVE_PATTERNS:
+        if pattern in key_lower:
+            return mask_func
+    return None
+
+
 def sanitize_log_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Sanitize sensitive data for logging
@@ -362,42 +576,44 @@ def sanitize_log_data(data: Dict[str, Any]) -> Dict[str, Any]:
         data: Dictionary containing potentially sensitive data
         
     Returns:
-        Sanitized dictionary safe for logging
+        Sanitized dictionary safe for logging (the input itself if nothing
+        needed masking)
     """
     if not settings.PII_MASKING_ENABLED:
         return data
     
-    # Define sensitive field patterns
-    sensitive_patterns = {
-        'phone': mask_phone,
-        'email': mask_email,
-        'name': mask_name,
-        'ssn': mask_ssn,
-        'patient': mask_name,
-        'caller': mask_name,
-    }
-    
-    sanitized = data.copy()
+    # Collect replacements only; most log payloads carry no sensitive keys
+    masked = {}
     
     for key, value in data.items():
         if value is None:
             continue
-            
-        # Check if key matches sensitive patterns
+        
         key_lower = key.lower()
-        for pattern, mask_func in sensitive_patterns.items():
-            if pattern in key_lower and isinstance(value, str):
-                sanitized[key] = mask_func(value)
-                break
-        
-        # Mask specific fields
-        if key_lower in ['password', 'token', 'api_key', 'secret']:
-            sanitized[key] = '***REDACTED***'
-        elif key_lower in ['authorization', 'cookie'] and isinstance(value, str):
+        if key_lower in _REDACT_KEYS:
+            masked[key] = '***REDACTED***'
+        elif not isinstance(value, str):
+            continue
+        elif key_lower in _TRUNCATE_KEYS:
             # Show only first few characters
-            sanitized[key] = value[:10] + '***' if len(value) > 10 else '***'
+            masked[key] = value[:10] + '***' if len(value) > 10 else '***'
+        else:
+            mask_func = _masker_for_key(key_lower)
+            if mask_func is not None:
+                masked[key] = mask_func(value)
     
-    return sanitized
+    if not masked:
+        return data
+    return {**data, **masked}
+
+
+# Alphanumeric token alphabet; random bytes >= 248 (62 * 4) are rejected so
+# the byte -> character mapping stays uniform
+_TOKEN_ALPHABET = string.ascii_letters + string.digits
+_TOKEN_TRANSLATION = bytes(
+    ord(_TOKEN_ALPHABET[b % len(_TOKEN_ALPHABET)]) if b < 248 else 0 for b in range(256)
+)
+_TOKEN_REJECTED_BYTES = bytes(range(248, 256))
 
 
 def generate_secure_token(length: int = 32) -> str:
@@ -408,14 +624,100 @@ def generate_secure_token(length: int = 32) -> str:
         length: Length of the token
         
     Returns:
-        Secure random token string
+        Secure random alphanumeric token string
+    """
+    # Alphanumeric only: API keys use '_' as their field separator
+    token = b''
+    while len(token) < length:
+        # A few spare bytes cover rejected values (~3%), usually one urandom read
+        token += secrets.token_bytes(length - len(token) + 4).translate(
+            _TOKEN_TRANSLATION, _TOKEN_REJECTED_BYTES
+        )
+    return token[:length].decode('ascii')
+
+
+class _TokenPool:
     """
-    alphabet = string.ascii_letters + string.digits
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    Pool of pre-generated random bytes for short alphanumeric tokens
+    Replaces one secrets.choice call per character with a slice of a
+    buffer that is refilled from the OS CSPRNG when exhausted
+    
+    The buffer is filled on first use and discarded in forked children,
+    so pre-fork workers never hand out the same tokens.
+    """
+    
+    def __init__(self, size: int = 65536):
+        self._size = size
+        self._discard()
+    
+    def _discard(self):
+        """Drop buffered bytes so the next take refills from the CSPRNG"""
+        self._buf = b''
+        self._offset = self._size
+        # A fresh lock too: a forked child cannot release a parent's holder
+        self._lock = threading.Lock()
+    
+    def take(self, length: int) -> str:
+        """
+        Take an alphanumeric token from the pool
+        
+        Args:
+            length: Length of the token
+            
+        Returns:
+            Secure random token string
+        """
+        token = b''
+        with self._lock:
+            while len(token) < length:
+                if self._offset >= self._size:
+                    self._buf = secrets.token_bytes(self._size)
+                    self._offset = 0
+                
+                # Read a couple of spare bytes to cover rejected values (~3%)
+                end = self._offset + length - len(token) + 2
+                token += self._buf[self._offset:end].translate(
+                    _TOKEN_TRANSLATION, _TOKEN_REJECTED_BYTES
+                )
+                self._offset = end
+        
+        return token[:length].decode('ascii')
+
+
+_token_pool = _TokenPool()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_token_pool._discard)
+
+
+def generate_pooled_token(length: int = 8) -> str:
+    """
+    Generate a short secure token from the pre-generated randomness pool
+    Intended for per-call identifiers on hot paths (e.g. stream IDs)
+    
+    Args:
+        length: Length of the token
+        
+    Returns:
+        Secure random alphanumeric token string
+    """
+    return _token_pool.take(length)
 
 
 # NOTE: API key generation with checksums - may be over-engineered for MVP
 # Consider using simple UUID tokens initially
+def _api_key_checksum(random_part: str) -> bytes:
+    """
+    Compute the 4-byte checksum embedded in API keys
+    
+    Args:
+        random_part: Random section of the API key
+        
+    Returns:
+        First 4 bytes of the SHA-256 digest
+    """
+    return hashlib.sha256(random_part.encode()).digest()[:4]
+
+
 def generate_api_key() -> str:
     """
     Generate a secure API key with checksum
@@ -430,7 +732,7 @@ def generate_api_key() -> str:
     random_part = generate_secure_token(32)
     
     # Create checksum
-    checksum = hashlib.sha256(random_part.encode()).hexdigest()[:8]
+    checksum = _api_key_checksum(random_part).hex()
     
     # Determine prefix based on environment
     prefix = "sk_test" if settings.IS_DEVELOPMENT else "sk_live"
@@ -451,23 +753,21 @@ def verify_api_key(api_key: str) -> bool:
     Note: Checksum verification adds security but may be unnecessary for MVP.
     Consider simple string comparison initially.
     """
-    try:
-        parts = api_key.split('_')
-        if len(parts) != 4:
-            return False
-        
-        prefix, _, random_part, provided_checksum = parts
-        
-        # Verify prefix
-        expected_prefix = "sk_test" if settings.IS_DEVELOPMENT else "sk_live"
-        if prefix != expected_prefix:
-            return False
-        
-        # Verify checksum
-        calculated_checksum = hashlib.sha256(random_part.encode()).hexdigest()[:8]
-        return hmac.compare_digest(calculated_checksum, provided_checksum)
-    except Exception:
+    match = _API_KEY_PATTERN.fullmatch(api_key) if isinstance(api_key, str) else None
+    if match is None:
+        return False
+    
+    prefix, random_part, provided_checksum = match.groups()
+    
+    # Verify prefix
+    expected_prefix = "sk_test" if settings.IS_DEVELOPMENT else "sk_live"
+    if prefix != expected_prefix:
         return False
+    
+    # Verify checksum on the raw digest bytes
+    return hmac.compare_digest(
+        _api_key_checksum(random_part), bytes.fromhex(provided_checksum)
+    )
 
 
 # JWT Token Management
@@ -552,6 +852,15 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Recent bcrypt results; rejections expire quickly so the cache cannot be
+# used to speed up guessing against a hash
+_verified_passwords = ExpiringKeys(maxsize=1024, ttl=300)
+_rejected_passwords = ExpiringKeys(maxsize=1024, ttl=5)
+_password_cache_lock = threading.Lock()
+# Per-process key, so cache keys in a memory dump cannot be brute-forced offline
+_password_cache_key = secrets.token_bytes(32)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its hash
@@ -563,7 +872,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    # Key on a keyed digest so the plaintext is never retained
+    key = hmac.new(
+        _password_cache_key,
+        plain_password.encode('utf-8') + b'|' + hashed_password.encode('utf-8'),
+        hashlib.sha256
+    ).digest()
+    
+    with _password_cache_lock:
+        if key in _verified_passwords:
+            return True
+        if key in _rejected_passwords:
+            return False
+    
+    # bcrypt runs outside the lock so concurrent checks are not serialised
+    verified = pwd_context.verify(plain_password, hashed_password)
+    
+    with _password_cache_lock:
+        if verified:
+            _verified_passwords.add(key)
+        else:
+            _rejected_passwords.add(key)
+    
+    return verified
 
 
 # Audit Logging Decorator
@@ -575,34 +906,37 @@ def audit_log(action: str):
         action: Description of the action being performed
     """
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            start_time = datetime.utcnow()
-            user_id = kwargs.get('user_id', 'anonymous')
-            
-            try:
-                result = await func(*args, **kwargs)
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.perf_counter()
+                user_id = kwargs.get('user_id', 'anonymous')
                 
-                if settings.AUDIT_LOG_ENABLED:
-                    logger.info(
-                        f"AUDIT: {action} | User: {user_id} | "
-                        f"Duration: {(datetime.utcnow() - start_time).total_seconds():.3f}s | "
-                        f"Status: SUCCESS"
-                    )
+                try:
+                    result = await func(*args, **kwargs)
                 
-                return result
-            except Exception as e:
-                if settings.AUDIT_LOG_ENABLED:
-                    logger.error(
-                        f"AUDIT: {action} | User: {user_id} | "
-                        f"Duration: {(datetime.utcnow() - start_time).total_seconds():.3f}s | "
-                        f"Status: FAILED | Error: {str(e)}"
-                    )
-                raise
+                    if settings.AUDIT_LOG_ENABLED:
+                        logger.info(
+                            f"AUDIT: {action} | User: {user_id} | "
+                            f"Duration: {time.perf_counter() - start_time:.3f}s | "
+                            f"Status: SUCCESS"
+                        )
+                    
+                    return result
+                except Exception as e:
+                    if settings.AUDIT_LOG_ENABLED:
+                        logger.error(
+                            f"AUDIT: {action} | User: {user_id} | "
+                            f"Duration: {time.perf_counter() - start_time:.3f}s | "
+                            f"Status: FAILED | Error: {str(e)}"
+                        )
+                    raise
+            
+            return async_wrapper
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start_time = datetime.utcnow()
+            start_time = time.perf_counter()
             user_id = kwargs.get('user_id', 'anonymous')
             
             try:
@@ -611,7 +945,7 @@ def audit_log(action: str):
                 if settings.AUDIT_LOG_ENABLED:
                     logger.info(
                         f"AUDIT: {action} | User: {user_id} | "
-                        f"Duration: {(datetime.utcnow() - start_time).total_seconds():.3f}s | "
+                        f"Duration: {time.perf_counter() - start_time:.3f}s | "
                         f"Status: SUCCESS"
                     )
                 
@@ -620,22 +954,21 @@ def audit_log(action: str):
                 if settings.AUDIT_LOG_ENABLED:
                     logger.error(
                         f"AUDIT: {action} | User: {user_id} | "
-                        f"Duration: {(datetime.utcnow() - start_time).total_seconds():.3f}s | "
+                        f"Duration: {time.perf_counter() - start_time:.3f}s | "
                         f"Status: FAILED | Error: {str(e)}"
                     )
                 raise
         
-        # Return appropriate wrapper based on function type
-        import asyncio
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return sync_wrapper
+        return sync_wrapper
     
     return decorator
 
 
 # Input Sanitization
+# Deletion table for C0 control characters (including NUL), keeping \t and \n
+_CONTROL_CHAR_TABLE = dict.fromkeys(c for c in range(32) if c not in (9, 10))
+
+
 def sanitize_input(text: str, max_length: int = 1000) -> str:
     """
     Sanitize user input to prevent injection attacks
@@ -653,11 +986,8 @@ def sanitize_input(text: str, max_length: int = 1000) -> str:
     # Truncate to max length
     text = text[:max_length]
     
-    # Remove null bytes
-    text = text.replace('\x00', '')
-    
-    # Remove control characters except newlines and tabs
-    text = ''.join(char for char in text if char == '\n' or char == '\t' or not ord(char) < 32)
+    # Remove null bytes and control characters except newlines and tabs
+    text = text.translate(_CONTROL_CHAR_TABLE)
     
     # Basic HTML escape (if needed for web display)
     # text = html.escape(text)
@@ -676,10 +1006,10 @@ def validate_phone_number(phone: str) -> bool:
         True if valid phone number
     """
     # Remove common formatting characters
-    cleaned = re.sub(r'[\s\-\(\)\+\.]', '', phone)
+    cleaned = _PHONE_CLEAN.sub('', phone)
     
     # Check if it's a valid phone number (10-15 digits)
-    return bool(re.match(r'^\d{10,15}$', cleaned))
+    return bool(_PHONE_VALID.match(cleaned))
 
 
 def validate_email(email: str) -> bool:
@@ -692,5 +1022,4 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid email
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
\ No newline at end of file
+    return bool(_EMAIL_VALID.match(email))
\ No newline at end of file
@@ -2,11 +2,10 @@
 WebSocket connection management for real-time audio streaming
 """
 import asyncio
-import base64
 import json
 import logging
-from typing import Dict, Optional, Set
-from datetime import datetime
+import time
+from typing import Dict, List, Optional, Set
 
 from fastapi import WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
@@ -17,11 +16,96 @@ from app.core.audio_buffer import AudioBuffer
 from app.core.latency_tracker import LatencyTracker
 from app.services.deepgram_service import DeepgramService
 from app.core.orchestrator import Orchestrator
-from app.utils.audio_utils import convert_mulaw_to_pcm, convert_pcm_to_mulaw
+from app.utils.audio_codec_fused import b64_decode_mulaw, pcm_to_mulaw_b64
+
+# Try to import orjson for the per-frame JSON messages, falling back to stdlib
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(message: dict) -> str:
+        return orjson.dumps(message).decode('utf-8')
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Twilio sends 20ms media frames; coalesce up to this many per buffer write
+MEDIA_FRAMES_PER_ADD = 5
+
+# One shared task reports latency for every connection at this interval
+LATENCY_REPORT_INTERVAL_SECONDS = 5
+
+
+# Outbound media frames differ only in their base64 payload, which never needs
+# JSON escaping, so the frame is built from a per-stream prefix and fixed suffix
+_MEDIA_SUFFIX = '"}}'
+
+
+# Inbound media frames are recognised by these markers and their payload sliced
+# out directly; anything else (start, stop, mark) goes through the JSON parser
+_MEDIA_EVENT_MARKER = '"event":"media"'
+_PAYLOAD_MARKER = '"payload":"'
+
+
+def _parse_media_frame(message: str) -> Optional[str]:
+    """
+    Extract the payload from a Twilio media frame
+    
+    Args:
+        message: Raw text frame received from Twilio
+        
+    Returns:
+        Base64 payload, or None if the frame is not a compact media frame
+        and needs full JSON parsing
+    """
+    if message.find(_MEDIA_EVENT_MARKER, 0, 40) < 0:
+        return None
+    
+    start = message.find(_PAYLOAD_MARKER)
+    if start < 0:
+        return None
+    start += len(_PAYLOAD_MARKER)
+    end = message.find('"', start)
+    if end < 0:
+        return None
+    payload = message[start:end]
+    if '\\' in payload:
+        # Escaped characters need the real JSON decoder
+        return None
+    return payload
+
+
+def _media_prefix(stream_sid: Optional[str]) -> str:
+    """
+    Build the JSON text preceding the payload of an outbound media frame
+    
+    Args:
+        stream_sid: Twilio stream SID (None until the start event arrives)
+        
+    Returns:
+        Frame prefix ending just inside the payload string
+    """
+    return '{"event":"media","streamSid":' + _json_dumps(stream_sid) + ',"media":{"payload":"'
+
+
+def _mark_prefix(stream_sid: Optional[str]) -> str:
+    """
+    Build the JSON text preceding the name of an outbound mark event
+    
+    Args:
+        stream_sid: Twilio stream SID (None until the start event arrives)
+        
+    Returns:
+        Frame prefix ending just before the JSON-encoded mark name
+    """
+    return '{"event":"mark","streamSid":' + _json_dumps(stream_sid) + ',"mark":{"name":'
+
 
 class WebSocketConnection:
     """
@@ -36,9 +120,54 @@ class WebSocketConnection:
         self.orchestrator: Optional[Orchestrator] = None
         self.latency_tracker = LatencyTracker(stream_id)
         self.is_connected = False
-        self.start_time = datetime.utcnow()
+        self.start_time = time.monotonic()  # For durations only, not wall-clock
         self.tasks: Set[asyncio.Task] = set()
         self._cleanup_called = False
+        # Bumped on every reuse so a cleanup aimed at an earlier call is ignored
+        self.generation = 0
+        # Set once cleanup() has finished and no task is still running
+        self.is_reusable = False
+        self.media_prefix = _media_prefix(conversation_state.twilio_stream_sid)
+        self.mark_prefix = _mark_prefix(conversation_state.twilio_stream_sid)
+    
+    def reset(self, websocket: WebSocket, stream_id: str, conversation_state: ConversationState):
+        """
+        Rebind a cleaned-up connection to a new call, keeping its allocations
+        
+        The audio ring is already cleared by cleanup(); only counters and
+        per-call references are reset here. The generation is bumped so any
+        cleanup still holding the previous call's generation becomes a no-op.
+        
+        Args:
+            websocket: WebSocket for the new call
+            stream_id: Stream identifier for the new call
+            conversation_state: Conversation state for the new call
+        """
+        self.websocket = websocket
+        self.stream_id = stream_id
+        self.conversation_state = conversation_state
+        self.audio_buffer.total_chunks_received = 0
+        self.audio_buffer.total_chunks_processed = 0
+        self.latency_tracker.stream_id = stream_id
+        self.latency_tracker.reset()
+        self.is_connected = False
+        self.start_time = time.monotonic()
+        self._cleanup_called = False
+        self.generation += 1
+        self.is_reusable = False
+        self.media_prefix = _media_prefix(conversation_state.twilio_stream_sid)
+        self.mark_prefix = _mark_prefix(conversation_state.twilio_stream_sid)
+    
+    def set_stream_sid(self, stream_sid: str):
+        """
+        Record the Twilio stream SID and rebuild the outbound frame prefixes
+        
+        Args:
+            stream_sid: Stream SID from Twilio's start event
+        """
+        self.conversation_state.twilio_stream_sid = stream_sid
+        self.media_prefix = _media_prefix(stream_sid)
+        self.mark_prefix = _mark_prefix(stream_sid)
     
     async def initialize(self):
         """
@@ -62,14 +191,21 @@ class WebSocketConnection:
             logger.error(f"Failed to initialize WebSocket connection: {e}", exc_info=True)
             raise
     
-    async def cleanup(self):
+    async def cleanup(self, generation: Optional[int] = None):
         """
         Clean up resources for this connection
+        
+        Args:
+            generation: Generation the caller saw; if the connection has since
+                been reused for another call, cleanup is skipped
         """
-        # Prevent multiple cleanup calls
+        # Prevent multiple cleanup calls, and cleanups of a later call
         if self._cleanup_called:
             return
+        if generation is not None and generation != self.generation:
+            return
         self._cleanup_called = True
+        self.is_reusable = False
         
         try:
             # Mark as disconnected first
@@ -113,13 +249,20 @@ class WebSocketConnection:
                 finally:
                     self.orchestrator = None
             
-            # Clear task set
+            # Only reusable if no task outlived the cancellation timeout
+            tasks_done = all(task.done() for task in self.tasks)
             self.tasks.clear()
             
+            # Drop per-call references so a pooled object holds no call data
+            self.websocket = None
+            self.conversation_state = None
+            
             # Log connection duration
-            duration = (datetime.utcnow() - self.start_time).total_seconds()
+            duration = time.monotonic() - self.start_time
             logger.info(f"WebSocket connection closed for stream {self.stream_id} after {duration:.2f}s")
             
+            self.is_reusable = tasks_done
+            
         except Exception as e:
             logger.error(f"Error during WebSocket cleanup: {e}", exc_info=True)
     
@@ -132,27 +275,33 @@ class WebSocketConnection:
 class WebSocketManager:
     """
     Manages WebSocket connections for all active calls
+    
+    The connection maps are only touched from the event loop thread, and no
+    check-then-update sequence spans an await, so plain dict operations are
+    atomic without a lock.
     """
     def __init__(self, max_connections: int = 50):
         self.connections: Dict[str, WebSocketConnection] = {}
         self.conversation_states: Dict[str, ConversationState] = {}
-        self._lock = asyncio.Lock()
         self.max_connections = max_connections
+        # Started with the first connection; exits once no connections remain
+        self._monitor_task: Optional[asyncio.Task] = None
+        # Cleaned-up connections kept for reuse by later calls
+        self._pool: List[WebSocketConnection] = []
+        self.pool_size = settings.CONNECTION_POOL_SIZE
     
     async def store_conversation_state(self, stream_id: str, state: ConversationState):
         """
         Store conversation state for later retrieval by WebSocket handler
         """
-        async with self._lock:
-            self.conversation_states[stream_id] = state
-            logger.debug(f"Stored conversation state for stream {stream_id}")
+        self.conversation_states[stream_id] = state
+        logger.debug("Stored conversation state for stream %s", stream_id)
     
     async def get_conversation_state(self, stream_id: str) -> Optional[ConversationState]:
         """
         Retrieve stored conversation state
         """
-        async with self._lock:
-            return self.conversation_states.get(stream_id)
+        return self.conversation_states.get(stream_id)
     
     async def handle_media_stream(self, websocket: WebSocket, stream_id: str):
         """
@@ -168,13 +317,12 @@ class WebSocketManager:
                 return
             
             # Check max connections before accepting
-            async with self._lock:
-                if len(self.connections) >= self.max_connections:
-                    logger.warning(
-                        f"Max connections reached ({self.max_connections}), rejecting stream {stream_id}"
-                    )
-                    await websocket.close(code=1008, reason="Server at capacity")
-                    return
+            if len(self.connections) >= self.max_connections:
+                logger.warning(
+                    f"Max connections reached ({self.max_connections}), rejecting stream {stream_id}"
+                )
+                await websocket.close(code=1008, reason="Server at capacity")
+                return
             
             # Accept WebSocket connection
             await websocket.accept()
@@ -187,19 +335,28 @@ class WebSocketManager:
                 await websocket.close(code=1011, reason="Invalid state")
                 return
             
-            # Create connection object
-            connection = WebSocketConnection(websocket, stream_id, conversation_state)
-            
-            # Store connection
-            async with self._lock:
-                # Double-check capacity under lock
-                if len(self.connections) >= self.max_connections:
-                    logger.warning(
-                        f"Max connections reached during race condition, rejecting stream {stream_id}"
-                    )
-                    await websocket.close(code=1008, reason="Server at capacity")
-                    return
-                self.connections[stream_id] = connection
+            # Reuse a pooled connection object or create one
+            if self._pool:
+                connection = self._pool.pop()
+                connection.reset(websocket, stream_id, conversation_state)
+            else:
+                connection = WebSocketConnection(websocket, stream_id, conversation_state)
+            
+            # Store connection; re-check capacity since the awaits above may
+            # have let other streams connect (check and insert do not await)
+            if len(self.connections) >= self.max_connections:
+                logger.warning(
+                    f"Max connections reached during race condition, rejecting stream {stream_id}"
+                )
+                await websocket.close(code=1008, reason="Server at capacity")
+                return
+            # Re-insert (not overwrite) so the map stays ordered by start_time
+            self.connections.pop(stream_id, None)
+            self.connections[stream_id] = connection
+            if self._monitor_task is None or self._monitor_task.done():
+                self._monitor_task = asyncio.create_task(
+                    self._monitor_latency(), name="monitor_latency"
+                )
             
             # Initialize connection services
             await connection.initialize()
@@ -213,34 +370,33 @@ class WebSocketManager:
                 self._process_transcripts(connection),
                 name=f"process_transcripts_{stream_id}"
             )
-            monitor_task = asyncio.create_task(
-                self._monitor_latency(connection),
-                name=f"monitor_latency_{stream_id}"
-            )
             
-            # Track tasks
-            connection.tasks.update({receive_task, process_task, monitor_task})
+            # Track tasks; the first one to finish resolves a shared future
+            connection.tasks.update({receive_task, process_task})
+            first_done: asyncio.Future = asyncio.get_running_loop().create_future()
             
-            # Wait for any task to complete (usually due to disconnect)
-            done, pending = await asyncio.wait(
-                connection.tasks,
-                return_when=asyncio.FIRST_COMPLETED
-            )
+            def _on_task_done(task: asyncio.Task):
+                if not first_done.done():
+                    first_done.set_result(task)
+            
+            for task in connection.tasks:
+                task.add_done_callback(_on_task_done)
+            
+            # Wait for any task to complete (usually due to disconnect);
+            # cleanup() cancels the rest
+            task = await first_done
             
             # Log which task completed first
-            for task in done:
-                try:
-                    exc = task.exception()
-                    if exc:
-                        logger.error(f"Task {task.get_name()} failed: {exc}")
-                        # Re-raise critical exceptions
-                        if not isinstance(exc, (WebSocketDisconnect, asyncio.CancelledError)):
-                            raise exc
-                    else:
-                        logger.info(f"Task {task.get_name()} completed normally")
-                except asyncio.InvalidStateError:
-                    # Task was cancelled
-                    logger.info(f"Task {task.get_name()} was cancelled")
+            if task.cancelled():
+                logger.info(f"Task {task.get_name()} was cancelled")
+            elif task.exception():
+                exc = task.exception()
+                logger.error(f"Task {task.get_name()} failed: {exc}")
+                # Re-raise critical exceptions
+                if not isinstance(exc, WebSocketDisconnect):
+                    raise exc
+            else:
+                logger.info(f"Task {task.get_name()} completed normally")
             
         except WebSocketDisconnect:
             logger.info(f"WebSocket disconnected for stream {stream_id}")
@@ -252,55 +408,77 @@ class WebSocketManager:
                 await connection.cleanup()
             
             # Remove from active connections
-            async with self._lock:
-                self.connections.pop(stream_id, None)
-                self.conversation_states.pop(stream_id, None)
+            removed = self._remove_connection(stream_id, connection)
+            
+            # Pool only from here, once this handler still owned the entry
+            # and cleanup finished with every task done
+            if removed and connection.is_reusable and len(self._pool) < self.pool_size:
+                self._pool.append(connection)
     
     async def _receive_audio(self, connection: WebSocketConnection):
         """
         Receive audio data from Twilio and forward to Deepgram
         """
+        audio_buffer = connection.audio_buffer
+        frames_per_add = min(MEDIA_FRAMES_PER_ADD, audio_buffer.chunks_per_buffer)
+        # Base64 μ-law payloads are batched and decoded once per batch; the
+        # μ-law bytes go to the buffer (and Deepgram) without PCM conversion
+        pending_payloads: List[str] = []
+        # Bound once; the media branch runs for ~every frame at 50fps
+        websocket = connection.websocket
+        receive_text = websocket.receive_text
+        record_audio_received = connection.latency_tracker.record_audio_received
+        
         try:
-            while connection.is_connected and connection.websocket.client_state == WebSocketState.CONNECTED:
+            while connection.is_connected and websocket.client_state == WebSocketState.CONNECTED:
                 # Receive message from Twilio
-                message = await connection.websocket.receive_text()
-                data = json.loads(message)
+                message = await receive_text()
+                payload = _parse_media_frame(message)
+                if payload is None:
+                    data = _json_loads(message)
+                    event = data.get('event')
+                    if event == 'media':
+                        payload = data['media']['payload']
                 
-                if data.get('event') == 'media':
-                    # Extract audio payload
-                    payload = data['media']['payload']
-                    timestamp = data.get('sequenceNumber', 0)
-                    
-                    # Decode from base64
-                    audio_data = base64.b64decode(payload)
-                    
-                    # Convert from μ-law to PCM for Deepgram
-                    pcm_data = convert_mulaw_to_pcm(audio_data)
-                    
-                    # Add to buffer
-                    connection.audio_buffer.add(pcm_data, timestamp)
+                if payload is not None:
+                    # Queue the payload for the next batch decode
+                    pending_payloads.append(payload)
                     
-                    # Forward to Deepgram if we have enough data
-                    if connection.audio_buffer.has_sufficient_data():
-                        audio_chunk = connection.audio_buffer.get_chunk()
-                        if audio_chunk and connection.deepgram_service:
-                            await connection.deepgram_service.send_audio(audio_chunk)
+                    if len(pending_payloads) >= frames_per_add:
+                        # Decode the batch's base64 in one pass
+                        await audio_buffer.add_joined(
+                            b64_decode_mulaw(pending_payloads), len(pending_payloads)
+                        )
+                        pending_payloads.clear()
+                        
+                        # Forward to Deepgram if we have enough data
+                        if audio_buffer.ready:
+                            # All ready chunks in one frame, as a view into the
+                            # ring that is sent before the next add
+                            audio_chunk = await audio_buffer.get_all_chunks_view()
+                            if audio_chunk and connection.deepgram_service:
+                                await connection.deepgram_service.send_audio(audio_chunk)
                     
                     # Track metrics
-                    connection.latency_tracker.record_audio_received()
+                    record_audio_received()
                     
-                elif data.get('event') == 'start':
+                elif event == 'start':
                     # Stream started
                     stream_sid = data['start']['streamSid']
                     logger.info(f"Media stream started: {stream_sid}")
-                    connection.conversation_state.twilio_stream_sid = stream_sid
+                    connection.set_stream_sid(stream_sid)
                     
-                elif data.get('event') == 'stop':
+                elif event == 'stop':
                     # Stream stopped - flush any remaining audio
                     logger.info(f"Media stream stopped for {connection.stream_id}")
                     
-                    # Flush remaining audio in buffer
-                    remaining_audio = await connection.audio_buffer.flush()
+                    # Flush batched frames and remaining audio in buffer
+                    if pending_payloads:
+                        await audio_buffer.add_joined(
+                            b64_decode_mulaw(pending_payloads), len(pending_payloads)
+                        )
+                        pending_payloads.clear()
+                    remaining_audio = await audio_buffer.flush()
                     if remaining_audio and connection.deepgram_service:
                         await connection.deepgram_service.send_audio(remaining_audio)
                         logger.info(f"Flushed {len(remaining_audio)} bytes of remaining audio")
@@ -308,17 +486,17 @@ class WebSocketManager:
                     connection.is_connected = False
                     break
                     
-                elif data.get('event') == 'mark':
+                elif event == 'mark':
                     # Custom mark event (used for tracking)
                     mark_name = data['mark']['name']
-                    logger.debug(f"Received mark event: {mark_name}")
+                    logger.debug("Received mark event: %s", mark_name)
                     
         except WebSocketDisconnect:
             logger.info(f"WebSocket disconnected during audio receive for {connection.stream_id}")
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e:  # Also raised by orjson
             logger.error(f"Invalid JSON received: {e}")
         except Exception as e:
-            logger.error(f"Error receiving audio: {e}", exc_info=True)
+            logger.error("Error receiving audio: %r", e)  # Traceback logged by handle_media_stream
             raise
     
     async def _process_transcripts(self, connection: WebSocketConnection):
@@ -341,31 +519,38 @@ class WebSocketManager:
                 connection.latency_tracker.record_transcript_processed()
                 
         except Exception as e:
-            logger.error(f"Error processing transcripts: {e}", exc_info=True)
+            logger.error("Error processing transcripts: %r", e)
             raise
     
-    async def _monitor_latency(self, connection: WebSocketConnection):
+    async def _monitor_latency(self):
         """
-        Monitor and report latency metrics
+        Monitor and report latency metrics for all connections
+        
+        A single task serves every connection, so K calls share one timer
+        instead of each waking its own task.
         """
         try:
-            while connection.is_connected:
-                # Report metrics every 5 seconds
-                await asyncio.sleep(5)
+            while self.connections:
+                # Report metrics every few seconds
+                await asyncio.sleep(LATENCY_REPORT_INTERVAL_SECONDS)
                 
-                metrics = connection.latency_tracker.get_metrics()
-                if metrics:
-                    logger.info(f"Latency metrics for {connection.stream_id}: {metrics}")
+                for connection in list(self.connections.values()):
+                    if not connection.is_connected:
+                        continue
                     
-                    # Check if latency is too high
-                    if metrics.get('avg_response_time', 0) > settings.MAX_RESPONSE_LATENCY:
-                        logger.warning(
-                            f"High latency detected for {connection.stream_id}: "
-                            f"{metrics['avg_response_time']:.2f}ms"
-                        )
+                    metrics = connection.latency_tracker.get_metrics()
+                    if metrics:
+                        logger.info(f"Latency metrics for {connection.stream_id}: {metrics}")
+                        
+                        # Check if latency is too high
+                        if metrics.get('avg_response_time', 0) > settings.MAX_RESPONSE_LATENCY:
+                            logger.warning(
+                                f"High latency detected for {connection.stream_id}: "
+                                f"{metrics['avg_response_time']:.2f}ms"
+                            )
                 
         except asyncio.CancelledError:
-            logger.debug(f"Latency monitoring cancelled for {connection.stream_id}")
+            logger.debug("Latency monitoring cancelled")
         except Exception as e:
             logger.error(f"Error monitoring latency: {e}", exc_info=True)
     
@@ -379,29 +564,17 @@ class WebSocketManager:
                 logger.warning(f"No active connection for stream {stream_id}")
                 return
             
-            # Convert PCM to μ-law for Twilio
-            mulaw_data = convert_pcm_to_mulaw(audio_data)
-            
-            # Encode to base64
-            encoded_audio = base64.b64encode(mulaw_data).decode('utf-8')
-            
-            # Create media message
-            message = {
-                "event": "media",
-                "streamSid": connection.conversation_state.twilio_stream_sid,
-                "media": {
-                    "payload": encoded_audio
-                }
-            }
+            # Convert PCM to base64 μ-law and splice it into the fixed media frame
+            encoded_audio = pcm_to_mulaw_b64(audio_data)
             
             # Send to Twilio
-            await connection.websocket.send_text(json.dumps(message))
+            await connection.websocket.send_text(connection.media_prefix + encoded_audio + _MEDIA_SUFFIX)
             
             # Track metrics
             connection.latency_tracker.record_audio_sent()
             
         except Exception as e:
-            logger.error(f"Error sending audio: {e}", exc_info=True)
+            logger.error("Error sending audio: %r", e)
     
     async def send_mark(self, stream_id: str, mark_name: str):
         """
@@ -412,18 +585,13 @@ class WebSocketManager:
             if not connection or not connection.is_connected:
                 return
             
-            message = {
-                "event": "mark",
-                "streamSid": connection.conversation_state.twilio_stream_sid,
-                "mark": {
-                    "name": mark_name
-                }
-            }
-            
-            await connection.websocket.send_text(json.dumps(message))
+            # Only the name varies; it is JSON-encoded on its own for escaping
+            await connection.websocket.send_text(
+                connection.mark_prefix + _json_dumps(mark_name) + '}}'
+            )
             
         except Exception as e:
-            logger.error(f"Error sending mark: {e}", exc_info=True)
+            logger.error("Error sending mark: %r", e)
     
     async def cleanup_call(self, call_sid: str):
         """
@@ -431,28 +599,29 @@ class WebSocketManager:
         """
         try:
             # Find connections for this call
-            connections_to_close = []
-            
-            async with self._lock:
-                for stream_id, conn in list(self.connections.items()):
-                    if conn.conversation_state.call_sid == call_sid:
-                        connections_to_close.append((stream_id, conn))
-            
-            # Close connections outside of lock to avoid deadlock
-            for stream_id, connection in connections_to_close:
+            connections_to_close = [
+                (stream_id, conn, conn.generation) for stream_id, conn in self.connections.items()
+                if conn.conversation_state.call_sid == call_sid
+            ]
+            
+            # Close connections (the list is a snapshot, so the dict may change
+            # and a connection may already be serving another call)
+            for stream_id, connection, generation in connections_to_close:
+                if connection.generation != generation:
+                    continue
                 try:
-                    # Close WebSocket if still connected
-                    if connection and connection.websocket.client_state == WebSocketState.CONNECTED:
-                        await connection.websocket.close()
+                    # Close WebSocket if still connected (cleanup() drops it, and the
+                    # stream's own handler may have finished while we awaited)
+                    websocket = connection.websocket
+                    if websocket is not None and websocket.client_state == WebSocketState.CONNECTED:
+                        await websocket.close()
                         logger.info(f"Closed WebSocket for call {call_sid}, stream {stream_id}")
                     
                     # Ensure cleanup is called
-                    await connection.cleanup()
+                    await connection.cleanup(generation)
                     
                     # Remove from connections
-                    async with self._lock:
-                        self.connections.pop(stream_id, None)
-                        self.conversation_states.pop(stream_id, None)
+                    self._remove_connection(stream_id, connection)
                         
                 except Exception as e:
                     logger.error(f"Error closing connection {stream_id}: {e}")
@@ -468,29 +637,51 @@ class WebSocketManager:
             max_age_seconds: Maximum age for a connection in seconds
         """
         try:
-            now = datetime.utcnow()
+            now = time.monotonic()
             stale_connections = []
             
-            async with self._lock:
-                for stream_id, conn in list(self.connections.items()):
-                    age = (now - conn.start_time).total_seconds()
-                    if age > max_age_seconds:
-                        stale_connections.append((stream_id, conn))
+            # Connections are inserted right after start_time is set, with no
+            # await in between, so the dict is ordered oldest first and the
+            # scan can stop at the first connection that is not stale
+            for stream_id, conn in self.connections.items():
+                age = now - conn.start_time
+                if age <= max_age_seconds:
+                    break
+                stale_connections.append((stream_id, conn, conn.generation, age))
             
             # Clean up stale connections
-            for stream_id, connection in stale_connections:
+            for stream_id, connection, generation, age in stale_connections:
                 logger.warning(f"Cleaning up stale connection {stream_id} (age: {age:.0f}s)")
                 try:
-                    await connection.cleanup()
-                    async with self._lock:
-                        self.connections.pop(stream_id, None)
-                        self.conversation_states.pop(stream_id, None)
+                    await connection.cleanup(generation)
+                    self._remove_connection(stream_id, connection)
                 except Exception as e:
                     logger.error(f"Error cleaning up stale connection {stream_id}: {e}")
                     
         except Exception as e:
             logger.error(f"Error cleaning up stale connections: {e}", exc_info=True)
     
+    def _remove_connection(self, stream_id: str, connection: Optional[WebSocketConnection]) -> bool:
+        """
+        Drop a stream's map entries if they still belong to this connection
+        
+        Callers remove entries after awaiting cleanup, by which time the
+        stream may have been rejected in favour of, or taken over by, another
+        connection object.
+        
+        Args:
+            stream_id: Stream identifier
+            connection: Connection being removed (None if never created)
+            
+        Returns:
+            True if the connection's own entry was removed
+        """
+        removed = connection is not None and self.connections.get(stream_id) is connection
+        if removed:
+            del self.connections[stream_id]
+        self.conversation_states.pop(stream_id, None)
+        return removed
+    
     def _validate_stream_auth(self, stream_id: str, websocket: WebSocket) -> bool:
         """
         Validate authentication for WebSocket connection
@@ -541,7 +732,7 @@ class WebSocketManager:
             "stream_id": stream_id,
             "call_sid": connection.conversation_state.call_sid,
             "is_connected": connection.is_connected,
-            "duration": (datetime.utcnow() - connection.start_time).total_seconds(),
+            "duration": time.monotonic() - connection.start_time,
             "latency_metrics": connection.latency_tracker.get_metrics()
         }
     
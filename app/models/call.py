@@ -22,8 +22,9 @@ class CallRecord:
     ):
         self.call_sid = call_sid
         # Store encrypted phone numbers for PHI compliance
-        self._from_number_encrypted = encryption_manager.encrypt(from_number)
-        self._to_number_encrypted = encryption_manager.encrypt(to_number)
+        self._from_number_encrypted, self._to_number_encrypted = (
+            encryption_manager.encrypt_many((from_number, to_number))
+        )
         self.stream_id = stream_id
         self.start_time = datetime.utcnow()
         self.end_time: Optional[datetime] = None
@@ -124,11 +125,17 @@ class CallRecord:
         
         if include_phi:
             # Include decrypted PHI
+            from_number, to_number, transcript, summary = encryption_manager.decrypt_many((
+                self._from_number_encrypted,
+                self._to_number_encrypted,
+                self._transcript_encrypted,
+                self._summary_encrypted
+            ))
             data.update({
-                "from_number": self.from_number,
-                "to_number": self.to_number,
-                "transcript": self.transcript,
-                "summary": self.summary
+                "from_number": from_number,
+                "to_number": to_number,
+                "transcript": transcript or None,
+                "summary": summary or None
             })
         else:
             # Include only masked phone numbers
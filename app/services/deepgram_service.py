@@ -3,7 +3,7 @@ Deepgram speech-to-text service stub
 TODO: Implement real-time STT with WebSocket connection
 """
 import logging
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, Union
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,9 @@ class DeepgramService:
     def __init__(self):
         self.api_key = settings.DEEPGRAM_API_KEY
         self.model = settings.DEEPGRAM_MODEL
+        # Twilio's 8kHz μ-law audio is streamed as-is; Deepgram decodes it natively
+        self.encoding = "mulaw"
+        self.sample_rate = 8000
         # TODO: Initialize WebSocket connection
         
     async def connect(self) -> bool:
@@ -30,7 +33,7 @@ class DeepgramService:
         """Disconnect from Deepgram"""
         logger.info("TODO: Implement Deepgram disconnect")
         
-    async def send_audio(self, audio_data: bytes) -> bool:
+    async def send_audio(self, audio_data: Union[bytes, memoryview]) -> bool:
         """Send audio data to Deepgram for transcription"""
         # TODO: Stream audio to Deepgram
         return True
@@ -30,20 +30,11 @@ def convert_mulaw_to_pcm(mulaw_data: bytes) -> bytes:
         return b''
     
     try:
-        # μ-law to PCM conversion table (pre-computed for efficiency)
-        # This avoids recalculating the same values repeatedly
-        ulaw_to_pcm_table = _get_ulaw_to_pcm_table()
-        
-        # Convert bytes to numpy array for efficient processing
+        # One gather through the 256-entry lookup table
         ulaw_array = np.frombuffer(mulaw_data, dtype=np.uint8)
+        pcm_bytes = _MULAW_TO_PCM_LUT[ulaw_array].tobytes()
         
-        # Apply conversion using lookup table
-        pcm_array = np.array([ulaw_to_pcm_table[u] for u in ulaw_array], dtype=np.int16)
-        
-        # Convert to bytes (little endian)
-        pcm_bytes = pcm_array.tobytes()
-        
-        logger.debug(f"Converted {len(mulaw_data)} bytes μ-law to {len(pcm_bytes)} bytes PCM")
+        logger.debug("Converted %d bytes μ-law to %d bytes PCM", len(mulaw_data), len(pcm_bytes))
         return pcm_bytes
         
     except Exception as e:
@@ -72,16 +63,11 @@ def convert_pcm_to_mulaw(pcm_data: bytes) -> bytes:
             logger.warning("PCM data has odd number of bytes, truncating last byte")
             pcm_data = pcm_data[:-1]
         
-        # Convert bytes to numpy array
-        pcm_array = np.frombuffer(pcm_data, dtype=np.int16)
+        # Index the 64K-entry lookup table by each sample's 16-bit pattern
+        pcm_array = np.frombuffer(pcm_data, dtype=np.uint16)
+        ulaw_bytes = _PCM_TO_MULAW_LUT[pcm_array].tobytes()
         
-        # Convert each PCM sample to μ-law
-        ulaw_array = np.array([_pcm_to_ulaw(sample) for sample in pcm_array], dtype=np.uint8)
-        
-        # Convert to bytes
-        ulaw_bytes = ulaw_array.tobytes()
-        
-        logger.debug(f"Converted {len(pcm_data)} bytes PCM to {len(ulaw_bytes)} bytes μ-law")
+        logger.debug("Converted %d bytes PCM to %d bytes μ-law", len(pcm_data), len(ulaw_bytes))
         return ulaw_bytes
         
     except Exception as e:
@@ -113,8 +99,7 @@ def _get_ulaw_to_pcm_table() -> list:
         mantissa = ulaw & 0x0F
         
         # Compute sample value
-        sample = (mantissa << (exponent + 3)) + ULAW_BIAS
-        sample = sample << (exponent + 3)
+        sample = (((mantissa << 3) + ULAW_BIAS) << exponent) - ULAW_BIAS
         
         # Apply sign bit
         if sign != 0:
@@ -167,6 +152,31 @@ def _pcm_to_ulaw(pcm_val: int) -> int:
     return ~ulaw & 0xFF
 
 
+def _build_pcm_to_ulaw_table() -> np.ndarray:
+    """
+    Generate PCM to μ-law conversion table (vectorized _pcm_to_ulaw)
+    
+    Returns:
+        Array of 65536 μ-law bytes indexed by a sample's unsigned 16-bit pattern
+    """
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), ULAW_CLIP) + ULAW_BIAS
+    
+    # Exponent is the position of the highest set bit above bit 7
+    exponent = np.clip(np.frexp(magnitude)[1] - 8, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    
+    table = np.empty(65536, dtype=np.uint8)
+    table[samples & 0xFFFF] = ~(sign | (exponent << 4) | mantissa) & 0xFF
+    return table
+
+
+# Conversion tables shared by the converters here and the fused codec
+_MULAW_TO_PCM_LUT = np.asarray(_get_ulaw_to_pcm_table(), dtype=np.int16)
+_PCM_TO_MULAW_LUT = _build_pcm_to_ulaw_table()
+
+
 def resample_audio(audio_data: bytes, from_rate: int, to_rate: int) -> bytes:
     """
     Resample audio from one sample rate to another
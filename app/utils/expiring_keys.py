@@ -0,0 +1,49 @@
+"""
+Bounded set of recently seen keys
+Used to remember handled webhook deliveries and recent password checks
+"""
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class ExpiringKeys:
+    """
+    Set of keys that each expire ttl seconds after being added
+    Holds at most maxsize keys; adding past that evicts the oldest
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize an empty key set
+        
+        Args:
+            maxsize: Maximum number of keys kept
+            ttl: Seconds a key stays present after it is added
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Key -> monotonic expiry time, oldest first (all keys share one TTL)
+        self._expires_at: "OrderedDict[Hashable, float]" = OrderedDict()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        expires = self._expires_at.get(key)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self._expires_at[key]
+            return False
+        return True
+    
+    def add(self, key: Hashable) -> None:
+        """
+        Add a key, restarting its TTL if already present
+        
+        Args:
+            key: Key to remember
+        """
+        expires_at = self._expires_at
+        expires_at[key] = time.monotonic() + self.ttl
+        expires_at.move_to_end(key)
+        while len(expires_at) > self.maxsize:
+            expires_at.popitem(last=False)
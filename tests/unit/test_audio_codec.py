@@ -0,0 +1,58 @@
+"""
+Unit tests for the fused base64 + μ-law media codec
+"""
+import base64
+import binascii
+import os
+
+import numpy as np
+import pytest
+
+from app.utils.audio_codec_fused import b64_decode_mulaw, pcm_to_mulaw_b64
+from app.utils.audio_utils import _pcm_to_ulaw, convert_mulaw_to_pcm, convert_pcm_to_mulaw
+
+
+class TestFusedAudioCodec:
+    """Test fused codec output matches the separate decode/convert passes"""
+
+    @pytest.mark.parametrize("frame_size", [160, 161, 162])
+    def test_decode_matches_separate_passes(self, frame_size):
+        """Test joined payloads (including padded ones) decode like individual frames"""
+        frames = [os.urandom(frame_size) for _ in range(3)]
+        payloads = [base64.b64encode(frame).decode('ascii') for frame in frames]
+
+        assert b64_decode_mulaw(payloads) == b''.join(frames)
+        assert b64_decode_mulaw([]) == b''
+
+    @pytest.mark.parametrize("sample_count", [160, 161, 162])
+    def test_encode_matches_separate_passes(self, sample_count):
+        """Test PCM encodes to the same base64 μ-law as the separate passes"""
+        rng = np.random.default_rng(sample_count)
+        pcm = rng.integers(-32768, 32767, size=sample_count, dtype=np.int16).tobytes()
+
+        expected = base64.b64encode(convert_pcm_to_mulaw(pcm)).decode('ascii')
+        assert pcm_to_mulaw_b64(pcm) == expected
+
+    def test_decode_rejects_malformed_payload(self):
+        """Test truncated base64 is reported rather than silently dropped"""
+        with pytest.raises(binascii.Error):
+            b64_decode_mulaw(["abc"])
+
+
+class TestMulawTables:
+    """Test the μ-law lookup tables against the scalar G.711 reference"""
+
+    def test_pcm_table_matches_scalar_encoder(self):
+        """Test every 16-bit sample encodes like _pcm_to_ulaw"""
+        samples = np.arange(-32768, 32768, dtype=np.int16)
+        expected = bytes(_pcm_to_ulaw(int(sample)) for sample in samples)
+
+        assert convert_pcm_to_mulaw(samples.tobytes()) == expected
+
+    def test_decode_then_encode_is_identity(self):
+        """Test decoded μ-law codes re-encode to themselves (0x7F is negative zero)"""
+        codes = bytes(code for code in range(256) if code != 0x7F)
+        pcm = convert_mulaw_to_pcm(codes)
+
+        assert max(abs(int(s)) for s in np.frombuffer(pcm, dtype=np.int16)) == 32124
+        assert convert_pcm_to_mulaw(pcm) == codes
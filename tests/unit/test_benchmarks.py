@@ -88,6 +88,31 @@ class TestPerformanceBenchmarks:
         assert phone_time < 100, f"Phone masking took {phone_time:.2f}ms for 1000 items"
         assert email_time < 200, f"Email masking took {email_time:.2f}ms for 1000 items (includes validation)"
     
+    def test_media_payload_decode_performance(self):
+        """Test base64 decode of batched 160-byte Twilio media frames"""
+        import base64
+        from app.utils.audio_codec_fused import _b64decode_many, b64_decode_mulaw
+        
+        # Five 20ms frames per batch; each 216-char payload ends in "=="
+        frames = [os.urandom(160) for _ in range(5)]
+        payloads = [base64.b64encode(frame).decode('ascii') for frame in frames]
+        assert _b64decode_many(payloads) == b''.join(frames)
+        assert b64_decode_mulaw(payloads) == b''.join(frames)
+        
+        start = time.perf_counter()
+        for _ in range(1000):
+            _b64decode_many(payloads)
+        fallback_time = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        for _ in range(1000):
+            b64_decode_mulaw(payloads)
+        decode_time = (time.perf_counter() - start) * 1000
+        
+        # 1000 batches is 100s of audio; decoding must stay a tiny fraction of that
+        assert fallback_time < 100, f"Fallback decode took {fallback_time:.2f}ms for 1000 batches"
+        assert decode_time < 100, f"Media decode took {decode_time:.2f}ms for 1000 batches"
+    
     @pytest.mark.asyncio
     async def test_health_endpoint_latency(self):
         """Simulate health endpoint performance"""
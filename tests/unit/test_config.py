@@ -32,6 +32,33 @@ class TestConfig:
             assert settings.IS_PRODUCTION is True
             assert settings.IS_DEVELOPMENT is False
     
+    def test_derived_settings_built_at_load(self):
+        """Test derived hosts and Redis URL are built once and still serialize"""
+        env = {"DEBUG": "false", "REDIS_URL": "redis://host:6379/0", "REDIS_PASSWORD": "pw"}
+        with patch.dict(os.environ, env, clear=True):
+            settings = Settings()
+            
+            assert settings.REDIS_URL_WITH_PASSWORD == "redis://:pw@host:6379/0"
+            assert "*" not in settings.ALLOWED_HOSTS
+            assert settings == Settings()
+            
+            dumped = settings.model_dump()
+            assert dumped["REDIS_URL_WITH_PASSWORD"] == "redis://:pw@host:6379/0"
+            assert dumped["ALLOWED_HOSTS"] == settings.ALLOWED_HOSTS
+    
+    def test_environment_flags_not_cached(self):
+        """Test IS_PRODUCTION/IS_DEVELOPMENT survive equality checks and copies"""
+        with patch.dict(os.environ, {"ENVIRONMENT": "production", "DEBUG": "false"}, clear=True):
+            settings = Settings()
+            other = Settings()
+            
+            assert settings.IS_PRODUCTION is True
+            assert settings == other
+            
+            copied = settings.model_copy(update={"ENVIRONMENT": "development"})
+            assert copied.IS_PRODUCTION is False
+            assert copied.IS_DEVELOPMENT is True
+    
     def test_cors_origins_parsing(self):
         """Test CORS origins parsing from JSON string"""
         # Test JSON array string
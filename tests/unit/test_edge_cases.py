@@ -5,14 +5,16 @@ Tests race conditions, missing state, and error scenarios
 import pytest
 import asyncio
 import json
+import time
 from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
 
 from fastapi import WebSocket
+from starlette.websockets import WebSocketState
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.core.websocket_manager import WebSocketManager, WebSocketConnection
+from app.core.websocket_manager import WebSocketManager, WebSocketConnection, _parse_media_frame
 from app.core.conversation_state import ConversationState
 from app.core.audio_buffer import AudioBuffer
 from app.core.config import get_settings
@@ -124,6 +126,120 @@ class TestWebSocketEdgeCases:
         # At least one should be rejected
         close_calls = sum(1 for ws in websockets_list if ws.close.called)
         assert close_calls >= 2, "At least 2 connections should be rejected"
+    
+    @pytest.mark.asyncio
+    async def test_connection_reset_for_reuse(self):
+        """
+        Test a cleaned-up connection can be rebound to a new call
+        """
+        states = [
+            ConversationState(
+                call_sid=f"CA_pool_{i}",
+                stream_id=f"stream_pool_{i}",
+                from_number="+1234567890",
+                to_number="+0987654321"
+            )
+            for i in range(2)
+        ]
+        connection = WebSocketConnection(AsyncMock(spec=WebSocket), "stream_pool_0", states[0])
+        connection.set_stream_sid("MZ_old")
+        await connection.audio_buffer.add(b'\xff' * 160, 1)
+        connection.latency_tracker.record_audio_received()
+        ring = connection.audio_buffer._ring
+        await connection.cleanup()
+        old_generation = connection.generation
+        assert connection.is_reusable
+        assert connection.websocket is None
+        assert connection.conversation_state is None
+        
+        new_websocket = AsyncMock(spec=WebSocket)
+        connection.reset(new_websocket, "stream_pool_1", states[1])
+        
+        assert connection.websocket is new_websocket
+        assert connection.stream_id == connection.latency_tracker.stream_id == "stream_pool_1"
+        assert connection.audio_buffer._ring is ring
+        assert len(connection.audio_buffer) == 0
+        assert connection.audio_buffer.total_chunks_received == 0
+        assert connection.latency_tracker.frames_received == 0
+        assert '"streamSid":null' in connection.media_prefix
+        assert not connection._cleanup_called
+        
+        # A late cleanup aimed at the previous call must not touch this one
+        await connection.cleanup(old_generation)
+        assert not connection._cleanup_called
+        assert connection.websocket is new_websocket
+    
+    @pytest.mark.asyncio
+    async def test_cleanup_call_skips_connection_cleaned_by_its_handler(self, websocket_manager):
+        """
+        Test cleanup_call tolerates a stream whose handler cleans up mid-loop
+        """
+        state = ConversationState(
+            call_sid="CA_race",
+            stream_id="stream_race_0",
+            from_number="+1234567890",
+            to_number="+0987654321"
+        )
+        connections = []
+        for i in range(2):
+            websocket = AsyncMock(spec=WebSocket)
+            websocket.client_state = WebSocketState.CONNECTED
+            connection = WebSocketConnection(websocket, f"stream_race_{i}", state)
+            websocket_manager.connections[connection.stream_id] = connection
+            connections.append(connection)
+        first, second = connections
+        
+        # While the first socket closes, the second stream's handler finishes
+        async def handler_finishes(*args, **kwargs):
+            await second.cleanup()
+            websocket_manager._remove_connection(second.stream_id, second)
+        first.websocket.close.side_effect = handler_finishes
+        
+        with patch('app.core.websocket_manager.logger') as mock_logger:
+            await websocket_manager.cleanup_call("CA_race")
+        
+        mock_logger.error.assert_not_called()
+        assert second.websocket is None
+        assert first._cleanup_called
+        assert websocket_manager.connections == {}
+    
+    @pytest.mark.asyncio
+    async def test_stale_sweep_stops_at_first_fresh_connection(self, websocket_manager):
+        """
+        Test stale connections (oldest first) are cleaned and fresh ones kept
+        """
+        now = time.monotonic()
+        ages = {"stream_old_0": 7200, "stream_old_1": 4000, "stream_new": 10}
+        for stream_id, age in ages.items():
+            conn = MagicMock()
+            conn.start_time = now - age
+            conn.cleanup = AsyncMock()
+            websocket_manager.connections[stream_id] = conn
+        
+        await websocket_manager.cleanup_stale_connections(max_age_seconds=3600)
+        
+        assert list(websocket_manager.connections) == ["stream_new"]
+        websocket_manager.connections["stream_new"].cleanup.assert_not_called()
+    
+    def test_media_frame_fast_path(self):
+        """
+        Test media payloads are sliced out and other frames fall back to JSON
+        """
+        frame = {
+            "event": "media",
+            "sequenceNumber": "42",
+            "media": {"track": "inbound", "chunk": "41", "timestamp": "820", "payload": "f/9+"},
+            "streamSid": "MZ123"
+        }
+        compact = json.dumps(frame, separators=(',', ':'))
+        assert _parse_media_frame(compact) == "f/9+"
+        
+        # Escaped payloads, spaced JSON and non-media events need full parsing
+        escaped = compact.replace("f/9+", "f\\/9+")
+        assert json.loads(escaped)["media"]["payload"] == "f/9+"
+        assert _parse_media_frame(escaped) is None
+        assert _parse_media_frame(json.dumps(frame)) is None
+        assert _parse_media_frame('{"event":"stop","streamSid":"MZ123"}') is None
 
 
 class TestAudioBufferEdgeCases:
@@ -150,14 +266,14 @@ class TestAudioBufferEdgeCases:
             await audio_buffer.add(b'\x00' * 160, i)
         
         # Check warning threshold
-        assert len(audio_buffer.buffer) == 95
+        assert len(audio_buffer) == 95
         
         # Add more to exceed warning threshold
         for i in range(10):
             await audio_buffer.add(b'\x00' * 160, 95 + i)
         
         # Should be capped at max_buffer_size
-        assert len(audio_buffer.buffer) <= audio_buffer.max_buffer_size
+        assert len(audio_buffer) <= audio_buffer.max_buffer_size
     
     @pytest.mark.asyncio
     async def test_flush_with_remnants(self, audio_buffer):
@@ -174,7 +290,62 @@ class TestAudioBufferEdgeCases:
         
         assert remaining is not None
         assert len(remaining) == 480  # Total bytes added
-        assert len(audio_buffer.buffer) == 0  # Buffer should be empty
+        assert len(audio_buffer) == 0  # Buffer should be empty
+    
+    @pytest.mark.asyncio
+    async def test_add_joined_matches_individual_adds(self, audio_buffer):
+        """
+        Test that a joined batch produces the same buffer contents as single adds
+        """
+        frames = [bytes([i]) * 160 for i in range(10)]
+        
+        await audio_buffer.add_joined(b''.join(frames), len(frames))
+        
+        assert audio_buffer.total_chunks_received == 10
+        assert audio_buffer.ready
+        chunk = await audio_buffer.get_chunk()
+        assert chunk == b''.join(frames)
+        assert len(audio_buffer) == 0
+    
+    @pytest.mark.asyncio
+    async def test_all_chunks_view_matches_copied_chunks(self):
+        """
+        Test zero-copy chunk views match copies, including across the ring wrap
+        """
+        # 25 frames is not a multiple of the 10-frame chunk, so reads wrap
+        audio_buffer = AudioBuffer(max_buffer_size=25)
+        reference = AudioBuffer(max_buffer_size=25)
+        for i in range(100):
+            frame = bytes([i % 256]) * audio_buffer.samples_per_chunk
+            await audio_buffer.add(frame, i)
+            await reference.add(frame, i)
+            
+            if audio_buffer.ready:
+                view = await audio_buffer.get_all_chunks_view()
+                assert bytes(view) == await reference.get_chunk()
+    
+    @pytest.mark.asyncio
+    async def test_all_chunks_view_coalesces_ready_chunks(self):
+        """
+        Test a burst of ready chunks is returned together, whole chunks only
+        """
+        audio_buffer = AudioBuffer(max_buffer_size=30)
+        frames = [bytes([i]) * audio_buffer.samples_per_chunk for i in range(25)]
+        for i, frame in enumerate(frames):
+            await audio_buffer.add(frame, i)
+        
+        view = await audio_buffer.get_all_chunks_view()
+        assert bytes(view) == b''.join(frames[:20])
+        assert audio_buffer.total_chunks_processed == 20
+        assert len(audio_buffer) == 5
+        assert await audio_buffer.get_all_chunks_view() is None
+    
+    def test_buffer_duration_must_be_chunk_multiple(self):
+        """
+        Test that a buffer duration not aligned to the chunk duration is rejected
+        """
+        with pytest.raises(ValueError):
+            AudioBuffer(chunk_duration_ms=20, buffer_duration_ms=210)
     
     def test_vad_with_corrupted_audio(self, audio_buffer):
         """
@@ -184,9 +355,13 @@ class TestAudioBufferEdgeCases:
         result = audio_buffer._is_silence(b'')
         assert result is False  # Should handle gracefully
         
-        # Test with odd-length data (zeros should be detected as silence)
-        result = audio_buffer._is_silence(b'\x00' * 159)  # Not divisible by sample size
-        assert result is True  # Zeros = silence
+        # Test with odd-length data (μ-law 0xFF decodes to zero amplitude)
+        result = audio_buffer._is_silence(b'\xff' * 159)  # Not divisible by sample size
+        assert result is True  # μ-law zero = silence
+        
+        # μ-law 0x00 is full-scale negative amplitude, not silence
+        result = audio_buffer._is_silence(b'\x00' * 160)
+        assert result is False
         
         # Test with non-audio data (random bytes with energy)
         result = audio_buffer._is_silence(b'not audio data')
@@ -206,7 +381,7 @@ class TestAudioBufferEdgeCases:
         async def get_chunks():
             chunks = []
             for _ in range(10):
-                if await audio_buffer.has_sufficient_data():
+                if audio_buffer.ready:
                     chunk = await audio_buffer.get_chunk()
                     if chunk:
                         chunks.append(chunk)
@@ -275,6 +450,35 @@ class TestConversationStateEdgeCases:
         assert conversation_state.appointment_context.duration_minutes == 60
         assert not hasattr(conversation_state.appointment_context, "invalid_field")
     
+    def test_to_json_matches_to_dict(self, conversation_state):
+        """
+        Test JSON serialization has the same content as to_dict
+        """
+        import json
+        from datetime import datetime
+        from app.core.conversation_state import CallStatus
+
+        conversation_state.update_appointment_context(preferred_date=datetime(2024, 5, 1, 9, 30))
+        conversation_state.set_status(CallStatus.COMPLETED)
+
+        assert json.loads(conversation_state.to_json()) == conversation_state.to_dict()
+
+    @pytest.mark.asyncio
+    async def test_transcript_stream_wakes_consumer(self, conversation_state):
+        """
+        Test a waiting consumer receives transcripts in arrival order
+        """
+        consumer = asyncio.create_task(conversation_state.next_transcript())
+        await asyncio.sleep(0)
+        assert not consumer.done()
+
+        conversation_state.push_transcript("first")
+        conversation_state.push_transcript("second")
+
+        assert await asyncio.wait_for(consumer, timeout=1) == "first"
+        assert await conversation_state.next_transcript() == "second"
+        assert not conversation_state.transcript_queue
+
     def test_conversation_history_overflow(self, conversation_state):
         """
         Test behavior with very large conversation history
@@ -287,8 +491,13 @@ class TestConversationStateEdgeCases:
                 confidence=0.95
             )
         
-        # Should handle large history
-        assert len(conversation_state.conversation_history) == 1000
+        # History is bounded; older turns are archived as text
+        from app.core.conversation_state import MAX_HISTORY_TURNS
+        assert len(conversation_state.conversation_history) == MAX_HISTORY_TURNS
+        transcript = conversation_state.get_full_transcript().split("\n")
+        assert len(transcript) == 1000
+        assert transcript[0] == "caller: Message 0"
+        assert transcript[-1] == "assistant: Message 999"
         
         # Get recent context should work
         recent = conversation_state.get_recent_context(5)
@@ -298,6 +507,15 @@ class TestConversationStateEdgeCases:
         # Serialization should work
         state_dict = conversation_state.to_dict()
         assert state_dict["conversation_turns"] == 1000
+        
+        # The archive is bounded too; dropped turns are only counted
+        from app.core.conversation_state import MAX_ARCHIVED_TURNS
+        for i in range(1000, 1000 + MAX_ARCHIVED_TURNS):
+            conversation_state.add_turn(speaker="caller", text=f"Message {i}")
+        transcript = conversation_state.get_full_transcript().split("\n")
+        assert len(conversation_state._archive) == MAX_ARCHIVED_TURNS
+        assert transcript[0] == f"[{1000 - MAX_HISTORY_TURNS} earlier turns omitted]"
+        assert len(transcript) == 1 + MAX_ARCHIVED_TURNS + MAX_HISTORY_TURNS
 
 
 class TestWebhookEdgeCases:
@@ -0,0 +1,100 @@
+"""
+Unit tests for latency tracking
+"""
+import random
+import statistics
+
+import pytest
+
+from app.core.latency_tracker import LatencyTracker, MetricWindow
+
+
+class TestMetricWindow:
+    """Test rolling latency statistics"""
+
+    def test_empty_window_summary(self):
+        """Test an empty window reports zeroed statistics"""
+        assert MetricWindow(10).summary() == {
+            "mean": 0.0, "median": 0.0, "min": 0.0, "max": 0.0, "count": 0
+        }
+
+    def test_matches_statistics_over_sliding_window(self):
+        """Test running statistics match a full recomputation after evictions"""
+        rng = random.Random(1234)
+        window = MetricWindow(25)
+        recent = []
+
+        for _ in range(500):
+            value = rng.randrange(0, 2_000_000_000)  # Nanoseconds
+            window.append(value)
+            recent = (recent + [value])[-25:]
+
+            recent_ms = [v / 1_000_000 for v in recent]
+            summary = window.summary()
+            assert summary["count"] == len(recent)
+            assert summary["mean"] == pytest.approx(statistics.mean(recent_ms))
+            assert summary["median"] == pytest.approx(statistics.median(recent_ms))
+            assert summary["min"] == pytest.approx(min(recent_ms))
+            assert summary["max"] == pytest.approx(max(recent_ms))
+
+        assert list(window) == recent
+
+
+class TestLatencyTracker:
+    """Test latency tracker metric recording"""
+
+    def test_max_samples_limit(self):
+        """Test each metric keeps only the most recent samples"""
+        tracker = LatencyTracker("stream_test", max_samples=3)
+
+        for value_ms in (10, 20, 30, 40):
+            tracker._add_metric("end_to_end_times", value_ms * 1_000_000)
+
+        assert list(tracker.metrics.end_to_end_times) == [20_000_000, 30_000_000, 40_000_000]
+        assert tracker.get_metrics()["avg_response_time"] == pytest.approx(30.0)
+
+        tracker.reset()
+        assert len(tracker.metrics.end_to_end_times) == 0
+
+    def test_markers_measure_milliseconds(self):
+        """Test marker deltas are reported in milliseconds"""
+        tracker = LatencyTracker("stream_test")
+        tracker.markers["start"] = 1_000_000_000
+        tracker.markers["end"] = 1_250_000_000
+
+        assert tracker.measure("start", "end") == pytest.approx(250.0)
+        assert tracker.measure("start", "missing") is None
+
+    def test_audio_frames_counted_and_sampled(self):
+        """Test every frame is counted and timestamped but only every 64th is measured"""
+        tracker = LatencyTracker("stream_test")
+
+        tracker.record_audio_sent()
+        sent = tracker.audio_sent_at
+        tracker.record_audio_received()
+        first = tracker.audio_received_at
+        assert first is not None
+        assert len(tracker.metrics.end_to_end_times) == 1
+
+        for _ in range(63):
+            tracker.record_audio_received()
+        assert tracker.audio_received_at > first
+        assert len(tracker.metrics.end_to_end_times) == 1
+
+        tracker.record_audio_received()
+        assert len(tracker.metrics.end_to_end_times) == 2
+        assert tracker.audio_sent_at == sent
+        assert tracker.get_metrics()["frames_received"] == 65
+
+    def test_high_latency_warnings_rate_limited(self, caplog):
+        """Test sustained high latency logs one warning per interval"""
+        tracker = LatencyTracker("stream_test")
+
+        with caplog.at_level("WARNING", logger="app.core.latency_tracker"):
+            for _ in range(5):
+                tracker._add_metric("response_generation_times", 2_000 * 1_000_000)
+
+        warnings = [r for r in caplog.records if "High latency" in r.getMessage()]
+        assert len(warnings) == 1
+        assert len(tracker.metrics.response_generation_times) == 5
+        assert tracker._suppressed_warnings["response_generation_times"] == 4
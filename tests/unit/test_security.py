@@ -14,6 +14,7 @@ from app.core.security_utils import (
     mask_ssn,
     sanitize_log_data,
     generate_secure_token,
+    generate_pooled_token,
     generate_api_key,
     verify_api_key,
     create_jwt_token,
@@ -60,6 +61,26 @@ class TestEncryptionManager:
         
         assert decrypted == original.decode('utf-8')
     
+    def test_batch_encryption_roundtrip(self):
+        """Test encrypting and decrypting several fields at once"""
+        manager = EncryptionManager()
+        values = ["+1234567890", b"+0987654321", "", None]
+
+        encrypted = manager.encrypt_many(values)
+
+        assert encrypted[2:] == ["", ""]
+        assert manager.decrypt(encrypted[0]) == "+1234567890"
+        assert manager.decrypt_many(encrypted) == ["+1234567890", "+0987654321", "", ""]
+
+    def test_legacy_fernet_token_decryption(self):
+        """Test tokens written with Fernet still decrypt after the AES-GCM switch"""
+        manager = EncryptionManager()
+
+        legacy = manager.fernet.encrypt(b"Legacy patient data").decode('utf-8')
+
+        assert manager.decrypt(legacy) == "Legacy patient data"
+        assert not manager.encrypt("New data").startswith("gAAAAA")
+
     def test_invalid_decryption_key(self):
         """Test decryption with wrong key"""
         manager1 = EncryptionManager()
@@ -197,6 +218,24 @@ class TestEncryptionManager:
         assert new_manager.decrypt(rotated_data["field2"]) == "value2"
         assert new_manager.decrypt(rotated_data["field3"]) == "value3"
 
+    @patch('app.core.security_utils._ROTATE_CHUNK_MIN', 4)
+    def test_key_rotation_parallel(self):
+        """Test rotation split across worker threads keeps every value"""
+        from cryptography.fernet import Fernet
+        old_manager = EncryptionManager()
+        data = {f"field{i}": old_manager.encrypt(f"value{i}") for i in range(50)}
+        data["empty"] = ""
+
+        new_key = Fernet.generate_key().decode()
+        rotated_data = old_manager.rotate_key(new_key, data)
+
+        new_manager = EncryptionManager(new_key)
+        assert rotated_data.keys() == data.keys()
+        assert rotated_data["empty"] == ""
+        assert all(
+            new_manager.decrypt(rotated_data[f"field{i}"]) == f"value{i}" for i in range(50)
+        )
+
 
 class TestDataMasking:
     """Test PHI/PII masking functions"""
@@ -219,6 +258,9 @@ class TestDataMasking:
         
         # Custom show_last parameter
         assert mask_phone("1234567890", show_last=2) == "XXXXXXXX90"
+        # The dashed US layout is only used with the default show_last=4
+        assert mask_phone("+1-123-456-7890", show_last=2) == "XXXXXXXXX90"
+        assert mask_phone("123-456-7890", show_last=6) == "XXXX567890"
         
         # Edge cases
         assert mask_phone("abc") == "XXX-XXX-XXXX"  # Non-digits return placeholder
@@ -317,6 +359,17 @@ class TestDataMasking:
         
         # Should return data unchanged
         assert sanitized == data
+    
+    def test_sanitize_log_data_follows_runtime_setting(self):
+        """Test the masking switch is read on every call, not at import"""
+        data = {"phone": "1234567890"}
+        
+        with patch('app.core.security_utils.settings') as mock_settings:
+            mock_settings.PII_MASKING_ENABLED = False
+            assert sanitize_log_data(data) == data
+            
+            mock_settings.PII_MASKING_ENABLED = True
+            assert sanitize_log_data(data)["phone"] == "XXX-XXX-7890"
 
 
 class TestTokenGeneration:
@@ -332,6 +385,31 @@ class TestTokenGeneration:
         assert token1 != token2  # Should be random
         assert token1.isalnum()  # Should be alphanumeric
     
+    def test_generate_pooled_token(self):
+        """Test pooled token generation, including pool refills"""
+        from app.core.security_utils import _TokenPool
+        
+        token1 = generate_pooled_token(8)
+        token2 = generate_pooled_token(8)
+        
+        assert len(token1) == 8
+        assert token1 != token2  # Should be random
+        assert token1.isalnum()  # Should be alphanumeric
+        
+        # A tiny pool must refill transparently
+        pool = _TokenPool(size=16)
+        tokens = [pool.take(8) for _ in range(100)]
+        assert all(len(t) == 8 and t.isalnum() for t in tokens)
+        assert len(set(tokens)) == 100
+        
+        # A forked child discards the inherited bytes before its first take
+        pool = _TokenPool(size=64)
+        pool.take(8)
+        inherited = pool._buf
+        pool._discard()
+        pool.take(8)
+        assert pool._buf != inherited
+    
     @patch('app.core.config.settings')
     def test_generate_api_key(self, mock_settings):
         """Test API key generation"""
@@ -477,6 +555,39 @@ class TestPasswordHashing:
         assert verify_password("WrongPassword", hashed) is False
         assert verify_password("", hashed) is False
     
+    def test_verify_password_cache(self, monkeypatch):
+        """Test cached results skip bcrypt, rejections expire and a new hash misses"""
+        from app.core import security_utils
+        from app.utils.expiring_keys import ExpiringKeys
+        monkeypatch.setattr(security_utils, "_verified_passwords", ExpiringKeys(maxsize=16, ttl=300))
+        monkeypatch.setattr(security_utils, "_rejected_passwords", ExpiringKeys(maxsize=16, ttl=5))
+        password = "CachedPassword1!"
+        hashed = hash_password(password)
+        other_hash = hash_password(password)
+        
+        with patch.object(
+            security_utils.pwd_context, "verify", wraps=security_utils.pwd_context.verify
+        ) as bcrypt_verify, patch("app.utils.expiring_keys.time") as mock_time:
+            mock_time.monotonic.return_value = 1000.0
+            
+            # A hit skips bcrypt
+            assert verify_password(password, hashed) is True
+            assert verify_password(password, hashed) is True
+            assert bcrypt_verify.call_count == 1
+            
+            # A different hash of the same password misses the cache
+            assert verify_password(password, other_hash) is True
+            assert bcrypt_verify.call_count == 2
+            
+            # Rejections are cached, but only for 5 seconds
+            assert verify_password("WrongPassword", hashed) is False
+            mock_time.monotonic.return_value = 1004.9
+            assert verify_password("WrongPassword", hashed) is False
+            assert bcrypt_verify.call_count == 3
+            mock_time.monotonic.return_value = 1005.0
+            assert verify_password("WrongPassword", hashed) is False
+            assert bcrypt_verify.call_count == 4
+    
     def test_different_hashes_same_password(self):
         """Test that same password produces different hashes"""
         password = "TestPassword"
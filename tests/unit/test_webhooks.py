@@ -170,6 +170,24 @@ class TestWebhookEndpoints:
         # Verify cleanup was called
         mock_ws_manager.cleanup_call.assert_called_once_with("CA123456789")
     
+    @patch('app.api.webhooks.validate_twilio_request')
+    @patch('app.api.webhooks.websocket_manager')
+    def test_call_status_duplicate_delivery(self, mock_ws_manager, mock_validate, client, monkeypatch):
+        """Test retried call status webhooks only trigger cleanup once"""
+        from app.utils.expiring_keys import ExpiringKeys
+        monkeypatch.setattr("app.api.webhooks._SEEN_EVENTS", ExpiringKeys(maxsize=16, ttl=600))
+
+        mock_validate.return_value = True
+        mock_ws_manager.cleanup_call = AsyncMock()
+
+        data = {"CallSid": "CA555", "CallStatus": "completed"}
+        for _ in range(3):
+            response = client.post("/api/webhooks/call-status", data=data)
+            assert response.status_code == 200
+            assert response.text == "OK"
+
+        mock_ws_manager.cleanup_call.assert_called_once_with("CA555")
+
     @patch('app.api.webhooks.validate_twilio_request')
     def test_recording_status(self, mock_validate, client):
         """Test recording status webhook"""
@@ -238,47 +256,57 @@ class TestWebhookEndpoints:
 class TestRequestValidation:
     """Test Twilio request validation"""
     
-    @patch('app.api.webhooks.settings')
-    def test_validate_request_development_mode(self, mock_settings):
+    @pytest.mark.asyncio
+    @patch('app.api.webhooks._SKIP_VALIDATION', True)
+    async def test_validate_request_development_mode(self):
         """Test request validation in development mode"""
         from app.api.webhooks import validate_twilio_request
         
-        # Mock settings
-        mock_settings.IS_DEVELOPMENT = True
-        mock_settings.TWILIO_VALIDATE_REQUESTS = False
-        mock_settings.TWILIO_AUTH_TOKEN = "test_token"
-        
         # Create mock request
         mock_request = MagicMock()
+        mock_request.body = AsyncMock()
         
-        # Should skip validation in development
-        assert validate_twilio_request(mock_request) is True
+        # Should skip validation in development without reading the body
+        assert await validate_twilio_request(mock_request) is True
+        mock_request.body.assert_not_called()
     
-    @patch('app.api.webhooks.RequestValidator')
-    @patch('app.api.webhooks.settings')
-    def test_validate_request_production_mode(self, mock_settings, mock_validator_class):
+    @pytest.mark.asyncio
+    @patch('app.api.webhooks._SKIP_VALIDATION', False)
+    async def test_validate_request_production_mode(self):
         """Test request validation in production mode"""
+        import hashlib
+        import hmac
+        from twilio.request_validator import RequestValidator
         from app.api.webhooks import validate_twilio_request
         
-        # Mock settings
-        mock_settings.IS_DEVELOPMENT = False
-        mock_settings.TWILIO_VALIDATE_REQUESTS = True
-        mock_settings.TWILIO_AUTH_TOKEN = "test_token"
-        
-        # Mock validator
-        mock_validator = MagicMock()
-        mock_validator.validate.return_value = True
-        mock_validator_class.return_value = mock_validator
+        url = "https://example.com:443/api/webhooks/call-status"
+        params = {"CallSid": "CA123", "CallStatus": "completed", "From": "+1234567890"}
+        signature = RequestValidator("test_token").compute_signature(url, params)
         
         # Create mock request
         mock_request = MagicMock()
-        mock_request.url = "https://example.com/webhook"
-        mock_request.headers = {"X-Twilio-Signature": "test_signature"}
-        mock_request.query_params = {"test": "param"}
+        mock_request.url = url
+        mock_request.body = AsyncMock(
+            return_value=b"CallSid=CA123&CallStatus=completed&From=%2B1234567890"
+        )
         
-        # Should validate in production
-        assert validate_twilio_request(mock_request) is True
+        proto = hmac.new(b"test_token", digestmod=hashlib.sha1)
+        with patch('app.api.webhooks._HMAC_PROTO', proto):
+            # Signature computed by the twilio library should validate
+            mock_request.headers = {"X-Twilio-Signature": signature}
+            assert await validate_twilio_request(mock_request) is True
+            
+            # Tampered signature should not
+            mock_request.headers = {"X-Twilio-Signature": "invalid_signature"}
+            assert await validate_twilio_request(mock_request) is False
+    
+    @pytest.mark.asyncio
+    @patch('app.api.webhooks._HMAC_PROTO', None)
+    @patch('app.api.webhooks._SKIP_VALIDATION', False)
+    async def test_validate_request_missing_token(self):
+        """Test request validation rejects requests when no auth token is configured"""
+        from app.api.webhooks import validate_twilio_request
+        
+        mock_request = MagicMock()
         
-        # Verify validator was called correctly
-        mock_validator_class.assert_called_once_with("test_token")
-        mock_validator.validate.assert_called_once()
\ No newline at end of file
+        assert await validate_twilio_request(mock_request) is False